@@ -0,0 +1,33 @@
+"""Headless core of Chess Mastery 3D: game state, evaluation, search/AI, coach and PGN.
+
+Nothing in this package imports Ursina/Panda3D, so it can be used from servers,
+batch tools and benchmarks; aaa_chess_3d.py is the 3D front-end on top of it.
+The UCI engine and Lazy-SMP modules (subprocess, multiprocessing) load on first access.
+"""
+import importlib
+
+from .ai import AIHandle, AIPlayer, AIWorker, ai_pick_move
+from .book import OpeningBook
+from .coach import coach_tips
+from .evaluation import CENTER_SQS, PIECE_VAL, Evaluator, evaluate
+from .game import Game, format_time
+from .i18n import LANGS, T
+from .interaction import Interaction
+from .pgn import export_pgn, game_to_pgn
+from .scheduler import FrameScheduler
+from .search import Searcher, TranspositionTable
+from .snapshot import PositionSnapshot
+from .tablebase import Tablebase
+
+__all__ = [
+    "AIHandle", "AIPlayer", "AIWorker", "ai_pick_move", "OpeningBook", "coach_tips", "EngineError", "UciEngine",
+    "CENTER_SQS", "PIECE_VAL", "Evaluator", "evaluate", "Game", "format_time", "LANGS", "T", "Interaction", "FrameScheduler",
+    "ParallelSearcher", "SharedTranspositionTable", "export_pgn", "game_to_pgn", "Searcher", "TranspositionTable", "PositionSnapshot", "Tablebase",
+]
+
+_LAZY = {"EngineError": ".engine", "UciEngine": ".engine",
+         "ParallelSearcher": ".parallel", "SharedTranspositionTable": ".parallel"}
+
+def __getattr__(name):
+    if name not in _LAZY: raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_LAZY[name], __name__), name)
@@ -0,0 +1,175 @@
+"""AI move selection (levels 1-3, optional Stockfish) and the background worker that runs it.
+
+The engine session, Lazy-SMP helpers and worker thread pool are imported on first use, so
+importing the core stays cheap.
+"""
+import atexit
+import random
+import threading
+
+import chess
+
+from .book import BOOK_MODE, default_book
+from .evaluation import CENTER_SQS, evaluate
+from .search import SEARCH_THREADS, SEARCH_TIME_MS, Searcher
+from .tablebase import default_tablebase
+
+PONDER_MAX_MS = 60_000  # a ponder never outlives this, even if nobody stops it
+
+def ai_pick_move(b:chess.Board, level:int=2, searcher=None, engine=None, stop=None, movetime_ms=SEARCH_TIME_MS,
+                 max_nodes=None, ev=None, book=None, tablebase=None):
+    # Opening book first (BOOK_MODE per level), Syzygy tablebase at level 3+ when it covers b, then:
+    # Level 1: random-ish with center preference
+    # Level 2: greedy capture-first + center
+    # Level 3: iterative-deepening search (movetime_ms / max_nodes), TT/PV reused across moves via `searcher`;
+    #          a UciEngine, when given, is asked first
+    # ev: Evaluator with custom weights for levels 2-3 (defaults to the module weights)
+    if book is not None:
+        mv = book.pick(b, BOOK_MODE.get(level))
+        if mv: return mv
+
+    if tablebase is not None and level >= 3:
+        mv, _ = tablebase.best_move(b)
+        if mv: return mv
+
+    if engine is not None and level >= 3:
+        from .engine import STOCKFISH_MOVETIME_MS
+        mv = engine.best_move(b, STOCKFISH_MOVETIME_MS, stop)
+        if mv: return mv
+
+    legal = list(b.legal_moves)
+    if not legal: return None
+
+    if level == 1:
+        def sc1(m):
+            s = 0
+            if b.is_capture(m): s += 5
+            if m.to_square in CENTER_SQS: s += 2
+            s += random.random()
+            return -s
+        return sorted(legal, key=sc1)[0]
+
+    if level == 2:
+        # one-ply greedy using evaluate after the move
+        best = None; best_val = -10**9 if b.turn else 10**9
+        for m in legal:
+            b.push(m); val = evaluate(b, ev); b.pop()
+            if b.turn:  # white to move originally
+                if val > best_val: best_val, best = val, m
+            else:
+                if val < best_val: best_val, best = val, m
+        return best
+
+    # level >=3: iterative deepening within the time budget
+    mv = (searcher or Searcher(evaluator=ev)).search(b, movetime_ms, max_nodes=max_nodes, stop=stop)
+    return mv or random.choice(legal)
+
+class AIPlayer:
+    # One AI opponent: level, its Searcher (TT/PV kept across the game) and, at level 3+,
+    # a lazily started Stockfish session when one is on PATH (engine_path="" disables it; PATH is
+    # only searched once level 3 is first used).
+    # book / tablebase: an OpeningBook / Tablebase, None for the shared default, False for none.
+    # threads > 1 runs the built-in search as Lazy SMP with threads-1 helper processes.
+    def __init__(self, level:int=2, engine_path=None, movetime_ms:int=SEARCH_TIME_MS, max_nodes:int=None,
+                 evaluator=None, book=None, tablebase=None, threads:int=SEARCH_THREADS):
+        self.level = level
+        self.book = default_book() if book is None else book or None
+        self.tablebase = default_tablebase() if tablebase is None else tablebase or None
+        self._engine_path = engine_path
+        self.engine = None
+        self.evaluator = evaluator
+        self.threads = threads
+        if threads > 1:
+            from .parallel import ParallelSearcher
+            self.searcher = ParallelSearcher(threads, evaluator=evaluator, tablebase=self.tablebase)
+            atexit.register(self.searcher.close)
+        else: self.searcher = Searcher(evaluator=evaluator, tablebase=self.tablebase)
+        self.movetime_ms = movetime_ms
+        self.max_nodes = max_nodes
+        self.stats = None  # search figures behind the last pick_move (None for book/tablebase/levels 1-2)
+
+    @property
+    def engine_path(self):
+        if self._engine_path is None:
+            from .engine import find_stockfish
+            self._engine_path = find_stockfish() or ""
+        return self._engine_path or None
+
+    @property
+    def uses_engine(self):
+        return self.level >= 3 and self.engine_path is not None
+
+    def get_engine(self):
+        if self.engine is None:
+            from .engine import STOCKFISH_HASH_MB, STOCKFISH_THREADS, UciEngine
+            self.engine = UciEngine(self.engine_path, threads=STOCKFISH_THREADS, hash_mb=STOCKFISH_HASH_MB)
+            atexit.register(self.engine.close)
+        return self.engine
+
+    def pick_move(self, b:chess.Board, stop=None):
+        engine = self.get_engine() if self.uses_engine else None
+        if engine is not None: engine.last_info = {}
+        self.searcher.nodes = 0
+        mv = ai_pick_move(b, self.level, self.searcher, engine, stop, self.movetime_ms, self.max_nodes,
+                          self.evaluator, self.book, self.tablebase)
+        if engine is not None and engine.last_info: self.stats = dict(engine.last_info, source="stockfish")
+        elif self.searcher.nodes: self.stats = dict(self.searcher.stats(), source="search")
+        else: self.stats = None
+        return mv
+
+    def ponder(self, b:chess.Board, stop=None, max_ms:int=PONDER_MAX_MS):
+        if self.uses_engine: self.get_engine().ponder(b, stop, max_ms)
+        else: self.searcher.search(b, movetime_ms=max_ms, stop=stop)
+
+    def expected_reply(self, b:chess.Board):
+        # Opponent reply predicted by the last search, if it still applies to b
+        if self.uses_engine:
+            mv = self.engine.ponder_move if self.engine else None
+        else:
+            pv = self.searcher.pv
+            mv = pv[1] if len(pv) >= 2 and b.move_stack and pv[0] == b.peek() else None
+        return mv if mv is not None and mv in b.legal_moves else None
+
+    def reset(self):
+        self.searcher.reset()
+        if self.engine is not None and self.engine.alive(): self.engine.new_game()
+
+    def close(self):
+        if self.engine is not None: self.engine.close()
+        if self.threads > 1: self.searcher.close()
+
+class AIHandle:
+    # Futures-style handle for one background job; the frame loop polls done()
+    def __init__(self, future, stop, fen):
+        self.future, self.stop, self.fen = future, stop, fen
+    def done(self): return self.future.done()
+    def result(self):
+        try: return self.future.result()
+        except Exception: return None
+    def cancel(self):
+        self.stop.set(); self.future.cancel()
+    def matches(self, b:chess.Board):
+        # A result only applies to the exact position it was computed for
+        return not self.stop.is_set() and b.fen() == self.fen
+
+class AIWorker:
+    # Single background thread: searches, ponders and searcher resets run one after another,
+    # so the Searcher/UciEngine state is only ever touched from this thread.
+    # Jobs still running at interpreter exit are stopped before the thread is joined.
+    def __init__(self):
+        from concurrent.futures import ThreadPoolExecutor
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        self.stops = set()  # stop events of submitted jobs not yet finished
+        # threading's exit hooks run before non-daemon threads are joined (atexit runs after)
+        getattr(threading, "_register_atexit", atexit.register)(self.shutdown)
+    def submit(self, fn, b:chess.Board, *args):
+        stop = threading.Event()
+        self.stops.add(stop)
+        future = self.pool.submit(fn, b.copy(), *args, stop=stop)
+        future.add_done_callback(lambda _: self.stops.discard(stop))
+        return AIHandle(future, stop, b.fen())
+    def run(self, fn, *args):
+        self.pool.submit(fn, *args)
+    def shutdown(self):
+        for stop in list(self.stops): stop.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
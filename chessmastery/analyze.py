@@ -0,0 +1,178 @@
+"""Streaming bulk PGN analysis: evaluation/search, coach tips and blunder flags for every move.
+
+    python -m chessmastery.analyze games.pgn -o annotated.pgn --depth 2 --jobs 8
+    python -m chessmastery.analyze games.pgn -o annotated.pgn --resume
+
+Games are read one at a time with chess.pgn.read_game and analyzed on a process pool.
+At most --window games are in flight, and they are written back in input order, so memory
+stays bounded whatever the size of the database. After each written game a checkpoint
+(<output>.ckpt) records the input and output offsets; --resume continues from it.
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+import chess.pgn
+
+from .coach import coach_tips
+from .evaluation import evaluate
+from .search import MATE, MATE_BOUND, Searcher
+
+BLUNDER_CP = 300   # eval drop (mover's view) that flags a move as a blunder
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def batch_scores(fen:str, ucis):
+    # Static scores of every position of a game in one NumPy call (no mobility term)
+    from . import batch_eval
+    b = chess.Board(fen); boards = [b.copy(stack=False)]
+    for uci in ucis:
+        b.push(chess.Move.from_uci(uci)); boards.append(b.copy(stack=False))
+    scores = batch_eval.evaluate_batch(batch_eval.encode(boards)).tolist()
+    for i, pos in enumerate(boards):
+        if pos.is_checkmate() or pos.is_stalemate(): scores[i] = evaluate(pos)
+    return scores
+
+def analyze_moves(task):
+    # Runs in a pool worker. task = (root fen, [uci moves], search depth, use NumPy batch eval at depth 0).
+    # Returns one (White-relative eval in cp, coach tips, blunder flag) per move.
+    fen, ucis, depth, batch = task
+    b = chess.Board(fen)
+    searcher = Searcher() if depth > 0 else None  # one TT per game: neighbouring positions share work
+    precomputed = iter(batch_scores(fen, ucis)) if batch and depth == 0 else None
+    def score(b):
+        if precomputed is not None: return next(precomputed)
+        if b.is_game_over(): return evaluate(b) if b.is_checkmate() else 0
+        if searcher is None: return evaluate(b)
+        searcher.search(b, movetime_ms=None, max_depth=depth)
+        return searcher.score if b.turn else -searcher.score
+    out = []
+    before = score(b)
+    for uci in ucis:
+        white_moved = b.turn
+        b.push(chess.Move.from_uci(uci))
+        after = score(b)
+        loss = (before - after) if white_moved else (after - before)
+        out.append((after, coach_tips(b), loss >= BLUNDER_CP))
+        before = after
+    return out
+
+def format_eval(cp:int):
+    if abs(cp) > MATE_BOUND:
+        plies = MATE - abs(cp)
+        return f"#{(plies + 1) // 2 if cp > 0 else -((plies + 1) // 2)}"
+    return f"{cp / 100:.2f}"
+
+def annotate(game:chess.pgn.Game, analysis):
+    node = game
+    for (cp, tips, blunder), child in zip(analysis, list(game.mainline())):
+        node = child
+        text = f"[%eval {format_eval(cp)}]"
+        if tips: text += " Coach: " + " ".join(tips)
+        node.comment = (node.comment + " " + text).strip() if node.comment else text
+        if blunder: node.nags.add(chess.pgn.NAG_BLUNDER)
+    return game
+
+def read_games(f, limit=None):
+    # Yields (game, input offset just after it); the handle is never read ahead of one game.
+    n = 0
+    while limit is None or n < limit:
+        game = chess.pgn.read_game(f)
+        if game is None: return
+        n += 1
+        yield game, f.tell()
+
+def peak_rss_mb():
+    if resource is None: return None, None
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / (1024 * 1024)  # ru_maxrss: KiB on Linux, bytes on macOS
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own, children
+
+def load_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(state, f)
+    os.replace(tmp, path)
+
+def run(src:str, dst:str, depth:int=2, jobs:int=None, window:int=None, resume:bool=False, limit:int=None,
+        batch:bool=False, report_every:float=5.0, out=sys.stdout):
+    jobs = jobs or os.cpu_count() or 1
+    window = window or jobs * 4
+    ckpt_path = dst + ".ckpt"
+    state = {"input_offset": 0, "output_offset": 0, "games": 0, "positions": 0}
+    if resume:
+        state = load_checkpoint(ckpt_path) or state
+        size = os.path.getsize(dst) if os.path.exists(dst) else -1
+        if size < state["output_offset"]:  # seeking past the end would pad the output with NULs
+            raise ValueError(f"{dst} is missing or shorter than its checkpoint; run again without --resume")
+    games = positions = 0
+    t0 = last_report = time.time()
+    with open(src, encoding="utf-8-sig", errors="replace") as f, \
+            open(dst, "r+" if resume and os.path.exists(dst) else "w", encoding="utf-8") as w, \
+            ProcessPoolExecutor(jobs) as pool:
+        f.seek(state["input_offset"])
+        w.seek(state["output_offset"]); w.truncate()
+        pending = collections.deque()
+        stream = read_games(f, limit)
+        while True:
+            while len(pending) < window:
+                item = next(stream, None)
+                if item is None: break
+                game, offset = item
+                ucis = [mv.uci() for mv in game.mainline_moves()]
+                task = (game.board().fen(), ucis, depth, batch)
+                pending.append((game, offset, len(ucis), pool.submit(analyze_moves, task)))
+            if not pending: break
+            game, offset, n, fut = pending.popleft()
+            try: annotate(game, fut.result())
+            except (ValueError, AssertionError) as e:  # illegal/unparseable game: copy it through unannotated
+                game.comment = (game.comment + f" analysis failed: {e}").strip()
+            print(game, file=w, end="\n\n")
+            w.flush(); os.fsync(w.fileno())  # on disk before the checkpoint points past it
+            games += 1; positions += n
+            state.update(input_offset=offset, output_offset=w.tell(), games=state["games"] + 1,
+                         positions=state["positions"] + n)
+            save_checkpoint(ckpt_path, state)
+            now = time.time()
+            if now - last_report >= report_every:
+                last_report = now
+                print(f"{state['games']} games, {positions / (now - t0):.0f} positions/s", file=out, flush=True)
+    elapsed = max(time.time() - t0, 1e-9)
+    own, children = peak_rss_mb()
+    rss = f", peak RSS {own:.0f} MB main / {children:.0f} MB largest worker" if own is not None else ""
+    print(f"done: {games} games, {positions} positions in {elapsed:.1f}s "
+          f"({positions / elapsed:.0f} positions/s){rss}", file=out, flush=True)
+    return {"games": games, "positions": positions, "seconds": elapsed, "peak_rss_mb": own, "worker_peak_rss_mb": children}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("pgn", help="input PGN database")
+    ap.add_argument("-o", "--output", required=True, help="annotated PGN to write")
+    ap.add_argument("--depth", type=int, default=2, help="search depth per position (0 = static eval only)")
+    ap.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument("--window", type=int, default=None, help="max games in flight (default: 4 x jobs)")
+    ap.add_argument("--limit", type=int, default=None, help="stop after this many games")
+    ap.add_argument("--resume", action="store_true", help="continue from <output>.ckpt")
+    ap.add_argument("--batch", action="store_true", help="with --depth 0: score each game in one NumPy call (needs numpy)")
+    args = ap.parse_args(argv)
+    try:
+        run(args.pgn, args.output, args.depth, args.jobs, args.window, args.resume, args.limit, args.batch)
+    except ValueError as e:
+        ap.error(str(e))
+
+if __name__ == "__main__":
+    main()
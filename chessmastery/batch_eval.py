@@ -0,0 +1,61 @@
+"""NumPy batch evaluation over compact bitboard arrays (optional dependency: numpy).
+
+A position is 14 uint64 words: 12 piece planes (White P N B R Q K, then Black), the side to
+move (0/1) and the castling-rights bitmask. evaluate_batch() computes the material,
+piece-square, center and castling terms for all rows at once; it equals
+Evaluator(mobility=False).full(board) for every position.
+"""
+import chess
+
+try:
+    import numpy as np
+except ImportError as e:  # keep the rest of the core usable without numpy
+    raise ImportError("chessmastery.batch_eval needs numpy: pip install numpy") from e
+
+from .evaluation import Evaluator
+
+PLANES = 14
+SIDE, CASTLING = 12, 13
+
+def plane_index(color:bool, piece_type:int):
+    return (0 if color else 6) + piece_type - 1
+
+def encode(boards):
+    # (N, 14) uint64 array from an iterable of chess.Board
+    rows = []
+    for b in boards:
+        row = [0] * PLANES
+        for c in chess.COLORS:
+            occ = b.occupied_co[c]
+            base = 0 if c else 6
+            row[base] = b.pawns & occ; row[base + 1] = b.knights & occ; row[base + 2] = b.bishops & occ
+            row[base + 3] = b.rooks & occ; row[base + 4] = b.queens & occ; row[base + 5] = b.kings & occ
+        row[SIDE] = int(b.turn); row[CASTLING] = b.castling_rights
+        rows.append(row)
+    return np.array(rows, dtype=np.uint64).reshape(-1, PLANES)
+
+def square_weights(ev:Evaluator=None):
+    # (12, 64) int32 signed weights, one row per piece plane
+    ev = ev or Evaluator(mobility=False)
+    w = np.zeros((12, 64), dtype=np.int32)
+    for c in chess.COLORS:
+        for pt in chess.PIECE_TYPES:
+            w[plane_index(c, pt)] = ev.sq_val[c][pt]
+    return w
+
+def unpack_squares(planes):
+    # (N, 12) uint64 bitboards -> (N, 12, 64) uint8 occupancy, square a1 first
+    as_bytes = np.ascontiguousarray(planes, dtype="<u8").view(np.uint8).reshape(planes.shape[0], 12, 8)
+    return np.unpackbits(as_bytes, axis=2, bitorder="little")
+
+def evaluate_batch(positions, ev:Evaluator=None, weights=None):
+    # White-relative centipawns for each row of `positions` (N, 14); mobility is not included
+    ev = ev or Evaluator(mobility=False)
+    w = square_weights(ev) if weights is None else weights
+    positions = np.asarray(positions, dtype=np.uint64)
+    occ = unpack_squares(positions[:, :12])
+    score = np.einsum("npq,pq->n", occ, w, dtype=np.int64)
+    rights = positions[:, CASTLING]
+    score += (rights & np.uint64(chess.BB_RANK_1) != 0) * ev.castle_bonus
+    score -= (rights & np.uint64(chess.BB_RANK_8) != 0) * ev.castle_bonus
+    return score
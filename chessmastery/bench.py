@@ -0,0 +1,369 @@
+"""Benchmarks for the headless core.
+
+    python -m chessmastery.bench eval-batch [--positions 20000]
+    python -m chessmastery.bench smp [--workers 1,2,4,8] [--depth 5]
+    python -m chessmastery.bench movegen [--games 20] [--journal]
+    python -m chessmastery.bench startup [--runs 5]
+    python -m chessmastery.bench frames
+    python -m chessmastery.bench suite [--json bench.json] [--baseline base.json] [--save-baseline base.json]
+"""
+import argparse
+import json
+import platform
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import chess
+
+from .evaluation import Evaluator, evaluate
+
+# Fixed middlegame/endgame suite for search benchmarks
+SEARCH_SUITE = [
+    "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP1B1PPP/R2QKB1R w KQ - 0 8",
+    "2rq1rk1/pp1bppbp/3p1np1/4n3/3NP3/1BN1BP2/PPPQ2PP/2KR3R w - - 5 12",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+]
+
+def random_positions(n:int, seed:int=0, max_plies:int=80):
+    # Positions sampled from random playouts; reproducible for a given seed
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        b = chess.Board()
+        for _ in range(rng.randint(1, max_plies)):
+            moves = list(b.legal_moves)
+            if not moves: break
+            b.push(rng.choice(moves))
+        out.append(b.copy(stack=False))
+    return out
+
+def timed(fn, *args):
+    t = time.perf_counter(); result = fn(*args); return result, time.perf_counter() - t
+
+def bench_eval_batch(positions:int=20000, seed:int=0, out=sys.stdout):
+    from . import batch_eval
+    boards = random_positions(positions, seed)
+    ev = Evaluator(mobility=False)
+    scalar, t_scalar = timed(lambda: [ev.full(b) for b in boards])
+    _, t_evaluate = timed(lambda: [evaluate(b) for b in boards])
+    encoded, t_encode = timed(batch_eval.encode, boards)
+    weights = batch_eval.square_weights(ev)
+    batch, t_batch = timed(batch_eval.evaluate_batch, encoded, ev, weights)
+    mismatches = sum(1 for a, b in zip(scalar, batch.tolist()) if a != b)
+    rows = [("scalar Evaluator.full (shared terms)", t_scalar), ("scalar evaluate() (+mobility, terminal checks)", t_evaluate),
+            ("batch encode", t_encode), ("batch evaluate (NumPy)", t_batch), ("batch encode + evaluate", t_encode + t_batch)]
+    for name, t in rows:
+        print(f"{name:<48} {positions / t:>12,.0f} pos/s", file=out)
+    print(f"mismatches vs scalar: {mismatches}", file=out)
+    return {name: positions / t for name, t in rows} | {"mismatches": mismatches}
+
+def bench_smp(workers=(1, 2, 4, 8), depth:int=5, fens=SEARCH_SUITE, out=sys.stdout):
+    # Time to a fixed depth and nodes/s over SEARCH_SUITE for each process count (fresh table per position)
+    from .parallel import ParallelSearcher
+    rows = []
+    for n in workers:
+        s = ParallelSearcher(threads=n)
+        elapsed = nodes = 0
+        try:
+            for fen in fens:
+                s.reset()
+                _, t = timed(s.search, chess.Board(fen), None, None, depth)
+                elapsed += t; nodes += s.total_nodes
+        finally:
+            s.close()
+        rows.append((n, elapsed, nodes))
+        base = rows[0][1]
+        print(f"{n:>2} workers  depth {depth}: {elapsed:7.2f} s  {nodes:>10,} nodes  {nodes / elapsed:>9,.0f} nps  "
+              f"speedup {base / elapsed:.2f}x", file=out, flush=True)
+    return [{"workers": n, "seconds": t, "nodes": nodes, "nps": nodes / t, "speedup": rows[0][1] / t} for n, t, nodes in rows]
+
+def count_movegen(fn, *args):
+    # Runs fn and returns (result, legal-move generations it triggered)
+    calls = [0]
+    orig = chess.Board.generate_legal_moves
+    def counted(self, *a, **kw):
+        calls[0] += 1
+        return orig(self, *a, **kw)
+    chess.Board.generate_legal_moves = counted
+    try: result = fn(*args)
+    finally: chess.Board.generate_legal_moves = orig
+    return result, calls[0]
+
+def bench_movegen(games:int=20, plies:int=80, seed:int=0, journal:bool=False, out=sys.stdout):
+    # Legal-move generations per ply for the client's per-move work (game-over check, coach,
+    # eval bar, status line, one selection click): direct board queries vs one PositionSnapshot.
+    # journal: the snapshot games are also journaled (SAN, clocks, eval per move), as in the client
+    import tempfile
+    from .coach import coach_tips
+    from .game import Game
+    from .journal import GameJournal
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(games):
+        b = chess.Board(); line = []
+        for _ in range(plies):
+            moves = list(b.legal_moves)
+            if not moves: break
+            line.append(rng.choice(moves)); b.push(line[-1])
+        lines.append(line)
+
+    def direct():
+        for line in lines:
+            b = chess.Board()
+            for mv in line:
+                b.push(mv)
+                b.is_game_over()
+                b.legal_moves.count(); sum(1 for m in b.legal_moves if b.is_capture(m))  # coach
+                evaluate(b)
+                b.is_checkmate(); b.is_stalemate()  # status line
+                {m.to_square for m in b.legal_moves if m.from_square == mv.to_square}  # click
+    def snapshot():
+        for i, line in enumerate(lines):
+            g = Game(journal=GameJournal(os.path.join(tmp, f"game{i}.cmj")) if journal else None)
+            for mv in line:
+                g.push(mv)
+                coach_tips(g.board, snapshot=g.snapshot); g.snapshot.eval
+                g.status(); g.legal_targets_from(mv.to_square)
+            if journal: g.journal.close()
+        return g
+    n = sum(len(line) for line in lines)
+    (_, before), t_before = timed(count_movegen, direct)
+    with tempfile.TemporaryDirectory() as tmp:
+        (g, after), t_after = timed(count_movegen, snapshot)
+    print(f"{'direct queries:':<18}{before / n:.2f} movegens/ply  {t_before / n * 1e6:7.1f} us/ply", file=out)
+    label = "snapshot+journal:" if journal else "snapshot:"
+    print(f"{label:<18}{after / n:.2f} movegens/ply  {t_after / n * 1e6:7.1f} us/ply", file=out)
+    print(f"{'eliminated:':<18}{(before - after) / n:.2f} movegens/ply; last game {g.snapshot_stats()}", file=out)
+    return {"plies": n, "before_per_ply": before / n, "after_per_ply": after / n}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold start of the non-graphics parts, timed inside a fresh interpreter
+CORE_STARTUP = """
+import time
+t0 = time.perf_counter()
+import chessmastery
+t1 = time.perf_counter()
+from chessmastery import AIPlayer, Game, coach_tips
+g = Game(); ai = AIPlayer(level=2)
+coach_tips(g.board, snapshot=g.snapshot); g.snapshot.eval
+g.push(ai.pick_move(g.board))
+t2 = time.perf_counter()
+print(f"import_core_ms={1000 * (t1 - t0):.1f} first_move_ms={1000 * (t2 - t0):.1f}")
+"""
+
+def run_timed(cmd, env=None, timeout=120):
+    # key=value floats from the last "...ms=" line a subprocess prints
+    out = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout).stdout
+    return {k: float(v) for k, v in re.findall(r"(\w+_ms)=([\d.]+)", out)}
+
+def bench_startup(runs:int=5, client:bool=True, out=sys.stdout):
+    # Median over fresh interpreters: core import / first AI move, then (if Ursina is installed)
+    # the 3D client's import and time-to-first-frame in an offscreen window
+    results = {}
+    samples = [run_timed([sys.executable, "-c", CORE_STARTUP]) for _ in range(runs)]
+    for key in ("import_core_ms", "first_move_ms"):
+        results[key] = statistics.median(s[key] for s in samples)
+    try:
+        import ursina  # noqa: F401
+    except ImportError:
+        client = False
+        print("ursina not installed: skipping the client time-to-first-frame", file=out)
+    if client:
+        env = dict(os.environ, CHESS_STARTUP_BENCH="1", CHESS_WINDOW=os.environ.get("CHESS_WINDOW", "offscreen"))
+        samples = [s for s in (run_timed([sys.executable, "aaa_chess_3d.py"], env) for _ in range(runs)) if s]
+        for key in ("import_ursina_ms", "first_frame_ms"):
+            if samples: results["client_" + key] = statistics.median(s[key] for s in samples)
+    for key, ms in results.items():
+        print(f"{key:<28} {ms:8.1f} ms", file=out)
+    return results
+
+def bench_frames(out=sys.stdout):
+    # The 3D client's frame-time percentiles in an offscreen window, with the AI idle and then
+    # thinking on its background thread (CHESS_FRAME_BENCH=1 in aaa_chess_3d.py)
+    try:
+        import ursina  # noqa: F401
+    except ImportError:
+        print("ursina not installed: no client to measure", file=out)
+        return {}
+    env = dict(os.environ, CHESS_FRAME_BENCH="1", CHESS_JOURNAL="0", CHESS_WINDOW=os.environ.get("CHESS_WINDOW", "offscreen"))
+    text = subprocess.run([sys.executable, "aaa_chess_3d.py"], cwd=ROOT, env=env, capture_output=True, text=True,
+                          timeout=120).stdout
+    results = {f"{phase}_{key}": float(v) for phase, rest in re.findall(r"^frames (\w+): (.*)$", text, re.M)
+               for key, v in re.findall(r"(\w+_ms)=([\d.]+)", rest)}
+    for key, ms in results.items():
+        print(f"{key:<28} {ms:8.1f} ms", file=out)
+    return results
+
+# Perft reference counts (chessprogramming.org "Perft Results"): (name, fen, depth, nodes)
+PERFT_SUITE = [
+    ("start", chess.STARTING_FEN, 4, 197281),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 3, 97862),
+    ("position3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 4, 43238),
+    ("position4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 3, 9467),
+    ("position5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 3, 62379),
+]
+SUITE_DEPTH = 4            # fixed search depth for the level 3 figures
+REGRESSION_THRESHOLD = 0.10
+MIN_TIME = 0.2             # seconds: shorter timings are looped until they take at least this long
+
+def perft(b:chess.Board, depth:int):
+    # Leaf count of the legal-move tree; the last ply is counted without being played
+    if depth == 1: return b.legal_moves.count()
+    n = 0
+    for mv in b.legal_moves:
+        b.push(mv); n += perft(b, depth - 1); b.pop()
+    return n
+
+def best_of(repeat:int, fn, *args, min_time:float=MIN_TIME):
+    # (result, seconds per call): fastest of `repeat` runs, each calling fn until min_time has
+    # passed so sub-millisecond work is not measured on a single call. The minimum is the least
+    # noisy estimate.
+    times = []
+    for _ in range(repeat):
+        calls, t0 = 0, time.perf_counter()
+        while True:
+            result = fn(*args); calls += 1
+            t = time.perf_counter() - t0
+            if t >= min_time: break
+        times.append(t / calls)
+    return result, min(times)
+
+def metric(value, unit:str, better:str):
+    # better: "higher" / "lower" for timings, "equal" for deterministic counts
+    return {"value": value, "unit": unit, "better": better}
+
+def bench_suite(repeat:int=3, depth:int=SUITE_DEPTH, positions:int=2000, out=sys.stdout):
+    # Perft correctness + movegen speed, evaluator throughput, per-level AI move cost, coach latency.
+    # Returns {"meta": ..., "metrics": {name: metric}, "failures": [...]}
+    from .ai import ai_pick_move
+    from .coach import coach_tips
+    from .search import Searcher
+    from .snapshot import PositionSnapshot
+    metrics, failures = {}, []
+    def report(name, m):
+        metrics[name] = m
+        v = m["value"]
+        print(f"{name:<36} {v:>14,.1f} {m['unit']}" if isinstance(v, float) else f"{name:<36} {v:>14,} {m['unit']}",
+              file=out, flush=True)
+
+    leaves = secs = 0
+    for name, fen, d, expected in PERFT_SUITE:
+        n, t = best_of(repeat, perft, chess.Board(fen), d)
+        if n != expected: failures.append(f"perft {name} depth {d}: {n} != {expected}")
+        report(f"perft.{name}.d{d}.nodes", metric(n, "nodes", "equal"))
+        leaves += n; secs += t
+    report("perft.nps", metric(leaves / secs, "nodes/s", "higher"))
+
+    boards = random_positions(positions, seed=1)
+    ev = Evaluator(mobility=False)
+    _, t = best_of(repeat, lambda: [ev.full(b) for b in boards])
+    report("eval.full.pos_per_s", metric(len(boards) / t, "pos/s", "higher"))
+    _, t = best_of(repeat, lambda: [evaluate(b) for b in boards])
+    report("eval.evaluate.pos_per_s", metric(len(boards) / t, "pos/s", "higher"))
+
+    suite = [chess.Board(fen) for fen in SEARCH_SUITE]
+    for level in (1, 2):
+        random.seed(0)
+        _, t = best_of(repeat, lambda: [ai_pick_move(b, level) for b in suite])
+        report(f"ai.level{level}.ms_per_move", metric(1000 * t / len(suite), "ms", "lower"))
+    searcher = Searcher()
+    def level3():
+        nodes = 0
+        for b in suite:
+            searcher.reset(); searcher.search(b, None, None, depth); nodes += searcher.total_nodes
+        return nodes
+    nodes, t = best_of(repeat, level3)
+    report(f"ai.level3.d{depth}.nodes", metric(nodes, "nodes", "equal"))
+    report(f"ai.level3.d{depth}.ms_per_move", metric(1000 * t / len(suite), "ms", "lower"))
+    report(f"ai.level3.d{depth}.nps", metric(nodes / t, "nodes/s", "higher"))
+
+    # Coach on a fresh position, including the snapshot it needs (what a new ply costs)
+    coach_boards = suite + boards[:200]
+    _, t = best_of(repeat, lambda: [coach_tips(b, snapshot=PositionSnapshot(b)) for b in coach_boards])
+    report("coach.us_per_position", metric(1e6 * t / len(coach_boards), "us", "lower"))
+
+    meta = {"python": platform.python_version(), "chess": chess.__version__, "machine": platform.machine(),
+            "platform": platform.platform(), "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": repeat}
+    for f in failures: print(f"FAIL {f}", file=out)
+    return {"meta": meta, "metrics": metrics, "failures": failures}
+
+def compare(results:dict, baseline:dict, threshold:float=REGRESSION_THRESHOLD, out=sys.stdout):
+    # Flags metrics worse than baseline by more than `threshold` (relative), changed deterministic
+    # counts and baseline metrics the new results lack; returns the list of regressions
+    regressions = []
+    print(f"\n{'metric':<36} {'baseline':>14} {'now':>14} {'change':>8}", file=out)
+    for name, m in results["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if base is None:
+            print(f"{name:<36} {'-':>14} {m['value']:>14,.1f}      new", file=out); continue
+        b, v = base["value"], m["value"]
+        change = (v - b) / b if b else 0.0
+        if m["better"] == "equal": bad = v != b
+        elif m["better"] == "higher": bad = change < -threshold
+        else: bad = change > threshold
+        if bad: regressions.append(name)
+        print(f"{name:<36} {b:>14,.1f} {v:>14,.1f} {change:>+7.1%}{'  REGRESSION' if bad else ''}", file=out)
+    for name, base in baseline.get("metrics", {}).items():
+        if name not in results["metrics"]:
+            regressions.append(name)
+            print(f"{name:<36} {base['value']:>14,.1f} {'-':>14}  MISSING", file=out)
+    if baseline.get("meta", {}).get("platform") != results["meta"]["platform"]:
+        print("note: baseline was recorded on a different platform; timings may not be comparable", file=out)
+    return regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("eval-batch", help="scalar vs NumPy batch evaluation throughput")
+    p.add_argument("--positions", type=int, default=20000)
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("smp", help="Lazy-SMP time-to-depth and nodes/s by worker count")
+    p.add_argument("--workers", default="1,2,4,8", help="comma-separated process counts")
+    p.add_argument("--depth", type=int, default=5)
+    p = sub.add_parser("movegen", help="legal-move generations per ply, direct vs snapshot")
+    p.add_argument("--games", type=int, default=20)
+    p.add_argument("--journal", action="store_true", help="journal the snapshot games, as the client does")
+    p = sub.add_parser("startup", help="cold-start times: core import, first move, client first frame")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--no-client", action="store_true", help="skip the 3D client")
+    sub.add_parser("frames", help="client frame-time p50/p95/p99 with the AI idle vs thinking")
+    p = sub.add_parser("suite", help="perft, evaluator, AI levels and coach; JSON results vs a baseline")
+    p.add_argument("--json", default="bench.json", help="results file")
+    p.add_argument("--baseline", help="compare against this results file; exit 1 on regressions")
+    p.add_argument("--save-baseline", help="also write the results here as the new baseline")
+    p.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="relative slowdown that fails")
+    p.add_argument("--repeat", type=int, default=3, help="runs per timing (fastest is kept)")
+    p.add_argument("--depth", type=int, default=SUITE_DEPTH, help="level 3 search depth")
+    args = ap.parse_args(argv)
+    if args.cmd == "eval-batch":
+        bench_eval_batch(args.positions, args.seed)
+    elif args.cmd == "smp":
+        bench_smp([int(n) for n in args.workers.split(",")], args.depth)
+    elif args.cmd == "movegen":
+        bench_movegen(args.games, journal=args.journal)
+    elif args.cmd == "startup":
+        bench_startup(args.runs, not args.no_client)
+    elif args.cmd == "frames":
+        bench_frames()
+    elif args.cmd == "suite":
+        results = bench_suite(args.repeat, args.depth)
+        for path in filter(None, (args.json, args.save_baseline)):
+            with open(path, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+        regressions = []
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f)
+            regressions = compare(results, baseline, args.threshold)
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}" if regressions else "no regressions")
+        if results["failures"] or regressions: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Polyglot opening book: memory-mapped, binary-searched by Zobrist key, opened on first use."""
+import os
+import random
+import time
+
+import chess
+import chess.polyglot
+
+BOOK_PATH = os.environ.get("CHESS_BOOK") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "book.bin")
+# Per AI level: "weighted" = random by entry weight (variety), "best" = highest weight; missing = no book
+BOOK_MODE = {1: "weighted", 2: "weighted", 3: "best"}
+
+class OpeningBook:
+    # chess.polyglot.MemoryMappedReader mmaps the file and bisects the sorted entries, so opening
+    # costs one mmap and RSS only grows by the pages a lookup touches, even for 100 MB books.
+    # A missing or empty file simply yields no book moves.
+    def __init__(self, path:str=BOOK_PATH, min_weight:int=1):
+        # min_weight applies to "best" lookups
+        self.path = path
+        self.min_weight = min_weight
+        self.reader = None
+        self.available = None  # unknown until first lookup
+        self.hits = self.misses = 0
+        self.lookup_ns = 0
+
+    def open(self):
+        if self.available is None:
+            try:
+                self.reader = chess.polyglot.open_reader(self.path)
+                self.available = True
+            except (OSError, ValueError):
+                self.available = False
+        return self.available
+
+    def pick(self, b:chess.Board, mode:str="best", rng:random.Random=None):
+        if not mode or not self.open(): return None
+        t = time.perf_counter_ns()
+        try:
+            if mode == "weighted":
+                entry = self.reader.weighted_choice(b, random=rng)  # weight-0 entries are never drawn
+            else:
+                entry = self.reader.find(b, minimum_weight=self.min_weight)
+            mv = entry.move
+        except IndexError:
+            mv = None
+        self.lookup_ns += time.perf_counter_ns() - t
+        if mv is None: self.misses += 1
+        else: self.hits += 1
+        return mv
+
+    def stats(self):
+        n = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "mean_lookup_us": self.lookup_ns / n / 1000 if n else 0.0}
+
+    def close(self):
+        if self.reader is not None: self.reader.close()
+        self.reader = None; self.available = None
+
+_default_book = None
+
+def default_book():
+    # Shared book at BOOK_PATH (or $CHESS_BOOK)
+    global _default_book
+    if _default_book is None: _default_book = OpeningBook()
+    return _default_book
@@ -0,0 +1,25 @@
+"""Edition-2 coach heuristics: center control, activity, initiative and endgame prompts."""
+import chess
+
+from .snapshot import PositionSnapshot
+
+TB_TIPS = {2: "Tablebase: winning, convert with the shortest path.", -2: "Tablebase: lost, make it as long as possible."}
+
+def coach_tips(b:chess.Board, tablebase=None, snapshot:PositionSnapshot=None):
+    # snapshot: PositionSnapshot of b (e.g. Game.snapshot), reused instead of regenerating moves
+    snap = snapshot or PositionSnapshot(b, tablebase)
+    snap.hits += 1
+    # Center control differential
+    center = snap.center_control()
+    # Activity
+    my_moves = len(snap.legal)
+    caps = len(snap.captures)
+    tips = []
+    if center > 0: tips.append("Center OK, keep tension on d4/e4/d5/e5.")
+    elif center < 0: tips.append("Contest center: push a pawn or reroute a knight.")
+    if caps == 0 and my_moves < 15: tips.append("Increase activity: unpin pieces, open a file for rooks.")
+    if snap.in_check: tips.append("Defend first, then counter with tempo.")
+    wdl = tablebase.probe_wdl(b) if tablebase is not None else snap.wdl
+    if wdl is not None: tips.append(TB_TIPS.get(wdl, "Tablebase: drawn, hold the draw."))
+    elif snap.pieces <= 10: tips.append("Endgame: activate king, create passed pawn.")
+    return tips
@@ -0,0 +1,137 @@
+"""Long-lived UCI engine session (Stockfish or any UCI-speaking executable)."""
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+import chess
+
+STOCKFISH_THREADS = int(os.environ.get("STOCKFISH_THREADS", "1"))
+STOCKFISH_HASH_MB = int(os.environ.get("STOCKFISH_HASH_MB", "64"))
+STOCKFISH_MOVETIME_MS = 500
+
+def find_stockfish():
+    return shutil.which("stockfish")
+
+INFO_FIELDS = ("depth", "seldepth", "nodes", "nps", "time")
+
+def parse_info(line:str):
+    parts = line.split()
+    return {k: int(parts[i + 1]) for i, k in enumerate(parts[:-1]) if k in INFO_FIELDS and parts[i + 1].isdigit()}
+
+class EngineError(Exception):
+    pass
+
+class UciEngine:
+    # One engine process for the whole session: `uci`/options/`ucinewgame` are sent once,
+    # then each move only sends `position startpos moves ...` + `go`, so NNUE and hash stay warm.
+    # The hash is keyed by position, so undos and ponder misses keep it; only a new root FEN
+    # (or an explicit new_game()) sends `ucinewgame`.
+    # A dead or wedged process is restarted transparently on the next request.
+    def __init__(self, cmd, threads=1, hash_mb=64, options=None):
+        self.cmd = list(cmd) if isinstance(cmd, (list, tuple)) else [cmd]
+        self.options = {"Threads": threads, "Hash": hash_mb, **(options or {})}
+        self.proc = None
+        self.lines = None
+        self.root = None  # root FEN of the last position sent
+        self.ponder_move = None  # engine's expected reply from the last bestmove
+        self.restarts = 0
+        self.last_info = {}  # depth/seldepth/nodes/nps/time of the last `info` line with node counts
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        self.kill()
+        self.proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        self.lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self.proc.stdout, self.lines), daemon=True).start()
+        self.send("uci"); self.wait_for("uciok", 10)
+        for name, value in self.options.items():
+            self.send(f"setoption name {name} value {value}")
+        self.new_game()
+
+    @staticmethod
+    def _pump(stdout, lines):
+        # Reader thread: lets wait_for() time out instead of blocking forever in readline()
+        for line in stdout: lines.put(line.strip())
+        lines.put(None)
+
+    def send(self, cmd:str):
+        self.proc.stdin.write(cmd + "\n"); self.proc.stdin.flush()
+
+    def wait_for(self, prefix:str, timeout:float, stop=None):
+        # With a stop event, a running search is told to `stop` once and its bestmove drained
+        deadline = time.time() + timeout
+        stopped = False
+        while True:
+            if stop is not None and not stopped and stop.is_set():
+                self.send("stop"); stopped = True; deadline = time.time() + 1
+            try: line = self.lines.get(timeout=max(0.0, min(0.05, deadline - time.time())))
+            except queue.Empty:
+                if time.time() >= deadline: raise EngineError(f"timeout waiting for {prefix!r}")
+                continue
+            if line is None: raise EngineError("engine exited")
+            if line.startswith("info ") and " nodes " in line: self.last_info = parse_info(line)
+            if line.startswith(prefix): return line
+
+    def new_game(self):
+        self.send("ucinewgame"); self.send("isready"); self.wait_for("readyok", 10)
+        self.root = None
+
+    def set_position(self, b:chess.Board):
+        root = b.root().fen()
+        moves = [m.uci() for m in b.move_stack]
+        if self.root is not None and self.root != root:
+            self.new_game()  # a different game: drop its hash entries
+        self.root = root
+        cmd = "position startpos" if root == chess.STARTING_FEN else f"position fen {root}"
+        self.send(cmd + (" moves " + " ".join(moves) if moves else ""))
+
+    def best_move(self, b:chess.Board, movetime_ms:int=500, stop=None):
+        for _ in range(2):  # one retry with a fresh process after a crash/hang
+            try:
+                if not self.alive(): self.start()
+                self.set_position(b)
+                self.send(f"go movetime {movetime_ms}")
+                try: line = self.wait_for("bestmove", movetime_ms / 1000 + 2, stop)
+                except EngineError:
+                    if not self.alive(): raise
+                    self.send("stop"); line = self.wait_for("bestmove", 1)
+                parts = line.split()
+                self.ponder_move = chess.Move.from_uci(parts[3]) if len(parts) >= 4 and parts[2] == "ponder" else None
+                if len(parts) < 2 or parts[1] == "(none)": return None
+                mv = chess.Move.from_uci(parts[1])
+                return mv if mv in b.legal_moves else None
+            except (OSError, ValueError, EngineError):
+                self.kill(); self.restarts += 1
+        return None
+
+    def ponder(self, b:chess.Board, stop, max_ms:int=60_000):
+        # Think on the opponent's expected position until stopped (or max_ms); the next real
+        # search of the same game then starts from a warm hash.
+        try:
+            if not self.alive(): self.start()
+            self.set_position(b)
+            self.send("go infinite")
+            if not stop.wait(max_ms / 1000): self.send("stop")
+            self.wait_for("bestmove", 1, stop)
+        except (OSError, EngineError):
+            self.kill()
+
+    def kill(self):
+        if self.proc is None: return
+        try: self.proc.kill(); self.proc.wait(1)
+        except Exception: pass
+        self.proc = None; self.root = None
+
+    def close(self):
+        if self.alive():
+            try:
+                self.send("quit"); self.proc.wait(1)
+            except Exception: pass
+        self.kill()
+
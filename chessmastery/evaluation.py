@@ -0,0 +1,152 @@
+"""Static evaluation: full reference evaluator plus an incremental one for search."""
+import random
+
+import chess
+
+CENTER_SQS = [chess.D4, chess.E4, chess.D5, chess.E5]
+
+# Simple centipawn evaluator (material + piece-square + center + mobility + king safety-ish)
+PIECE_VAL = {chess.PAWN:100, chess.KNIGHT:320, chess.BISHOP:330, chess.ROOK:500, chess.QUEEN:900, chess.KING:0}
+CENTER_BONUS = 12
+MOBILITY_BONUS = 2
+CASTLE_BONUS = 10
+SEARCH_MOBILITY = False   # mobility costs O(pieces) per leaf; search leaves stay O(1) without it
+
+# Piece-square tables, White's view, listed rank 8 first (index = square ^ 56 for White, square for Black)
+PST = {
+    chess.PAWN: (
+          0,  0,  0,  0,  0,  0,  0,  0,  50, 50, 50, 50, 50, 50, 50, 50,
+         10, 10, 20, 30, 30, 20, 10, 10,   5,  5, 10, 25, 25, 10,  5,  5,
+          0,  0,  0, 20, 20,  0,  0,  0,   5, -5,-10,  0,  0,-10, -5,  5,
+          5, 10, 10,-20,-20, 10, 10,  5,   0,  0,  0,  0,  0,  0,  0,  0),
+    chess.KNIGHT: (
+        -50,-40,-30,-30,-30,-30,-40,-50, -40,-20,  0,  0,  0,  0,-20,-40,
+        -30,  0, 10, 15, 15, 10,  0,-30, -30,  5, 15, 20, 20, 15,  5,-30,
+        -30,  0, 15, 20, 20, 15,  0,-30, -30,  5, 10, 15, 15, 10,  5,-30,
+        -40,-20,  0,  5,  5,  0,-20,-40, -50,-40,-30,-30,-30,-30,-40,-50),
+    chess.BISHOP: (
+        -20,-10,-10,-10,-10,-10,-10,-20, -10,  0,  0,  0,  0,  0,  0,-10,
+        -10,  0,  5, 10, 10,  5,  0,-10, -10,  5,  5, 10, 10,  5,  5,-10,
+        -10,  0, 10, 10, 10, 10,  0,-10, -10, 10, 10, 10, 10, 10, 10,-10,
+        -10,  5,  0,  0,  0,  0,  5,-10, -20,-10,-10,-10,-10,-10,-10,-20),
+    chess.ROOK: (
+          0,  0,  0,  0,  0,  0,  0,  0,   5, 10, 10, 10, 10, 10, 10,  5,
+         -5,  0,  0,  0,  0,  0,  0, -5,  -5,  0,  0,  0,  0,  0,  0, -5,
+         -5,  0,  0,  0,  0,  0,  0, -5,  -5,  0,  0,  0,  0,  0,  0, -5,
+         -5,  0,  0,  0,  0,  0,  0, -5,   0,  0,  0,  5,  5,  0,  0,  0),
+    chess.QUEEN: (
+        -20,-10,-10, -5, -5,-10,-10,-20, -10,  0,  0,  0,  0,  0,  0,-10,
+        -10,  0,  5,  5,  5,  5,  0,-10,  -5,  0,  5,  5,  5,  5,  0, -5,
+          0,  0,  5,  5,  5,  5,  0, -5, -10,  5,  5,  5,  5,  5,  0,-10,
+        -10,  0,  5,  0,  0,  0,  0,-10, -20,-10,-10, -5, -5,-10,-10,-20),
+    chess.KING: (
+        -30,-40,-40,-50,-50,-40,-40,-30, -30,-40,-40,-50,-50,-40,-40,-30,
+        -30,-40,-40,-50,-50,-40,-40,-30, -30,-40,-40,-50,-50,-40,-40,-30,
+        -20,-30,-30,-40,-40,-30,-30,-20, -10,-20,-20,-20,-20,-20,-20,-10,
+         20, 20,  0,  0,  0,  0, 20, 20,  20, 30, 10,  0,  0, 10, 30, 20),
+}
+
+class Evaluator:
+    # Material + piece-square + center terms kept as a running White-relative sum that is
+    # updated per push/pop delta, so a leaf costs O(1). full() is the reference recompute.
+    # Terminal positions (mate/stalemate) are the caller's job; see evaluate().
+    def __init__(self, piece_val=None, center_bonus=CENTER_BONUS, mobility_bonus=MOBILITY_BONUS,
+                 castle_bonus=CASTLE_BONUS, mobility=True):
+        self.piece_val = dict(PIECE_VAL, **(piece_val or {}))
+        self.center_bonus, self.mobility_bonus, self.castle_bonus = center_bonus, mobility_bonus, castle_bonus
+        self.mobility = mobility
+        # sq_val[color][piece_type][square]: signed contribution of that piece on that square
+        self.sq_val = {}
+        for c in chess.COLORS:
+            sign = 1 if c else -1
+            self.sq_val[c] = [None] + [
+                [sign * (self.piece_val[pt] + PST[pt][sq ^ 56 if c else sq] + (center_bonus if sq in CENTER_SQS else 0))
+                 for sq in chess.SQUARES]
+                for pt in chess.PIECE_TYPES]
+        self.score = 0
+        self.stack = []
+
+    def full(self, b:chess.Board):
+        sq_val = self.sq_val
+        score = sum(sq_val[p.color][p.piece_type][sq] for sq, p in b.piece_map().items())
+        return score + self.dynamic(b)
+
+    def dynamic(self, b:chess.Board):
+        # Terms read straight off the board rather than tracked through moves
+        score = 0
+        if b.castling_rights & chess.BB_RANK_1: score += self.castle_bonus
+        if b.castling_rights & chess.BB_RANK_8: score -= self.castle_bonus
+        if self.mobility:
+            # pseudo-legal attack count of minor/major pieces instead of full legal movegen
+            for c, sign in ((chess.WHITE, 1), (chess.BLACK, -1)):
+                own = b.occupied_co[c]
+                mob = 0
+                for sq in chess.scan_forward(own & ~b.pawns & ~b.kings):
+                    mob += chess.popcount(b.attacks_mask(sq) & ~own)
+                score += sign * mob * self.mobility_bonus
+        return score
+
+    def reset(self, b:chess.Board):
+        sq_val = self.sq_val
+        self.score = sum(sq_val[p.color][p.piece_type][sq] for sq, p in b.piece_map().items())
+        self.stack = []
+
+    def evaluate(self, b:chess.Board):
+        return self.score + self.dynamic(b)
+
+    def delta(self, b:chess.Board, mv:chess.Move):
+        # Score change of playing mv on b (b is the position *before* the move)
+        fr, to = mv.from_square, mv.to_square
+        c = b.turn
+        t = self.sq_val[c]
+        pt = b.piece_type_at(fr)
+        d = -t[pt][fr]
+        if pt == chess.KING and b.is_castling(mv):
+            rank = fr & 56
+            if b.is_kingside_castling(mv): kto, rfr, rto = rank + 6, rank + 7, rank + 5
+            else: kto, rfr, rto = rank + 2, rank + 0, rank + 3
+            return d + t[chess.KING][kto] - t[chess.ROOK][rfr] + t[chess.ROOK][rto]
+        if pt == chess.PAWN and b.is_en_passant(mv):
+            d -= self.sq_val[not c][chess.PAWN][to ^ 8]
+        else:
+            cap = b.piece_type_at(to)
+            if cap: d -= self.sq_val[not c][cap][to]
+        return d + t[mv.promotion or pt][to]
+
+    def push(self, b:chess.Board, mv:chess.Move):
+        self.stack.append(self.score)
+        self.score += self.delta(b, mv)
+        b.push(mv)
+
+    def pop(self, b:chess.Board):
+        b.pop()
+        self.score = self.stack.pop()
+
+evaluator = Evaluator()
+
+def evaluate(b:chess.Board, ev:Evaluator=None):
+    if b.is_checkmate():
+        return -99999 if b.turn else 99999
+    if b.is_stalemate(): return 0
+    return (ev or evaluator).full(b)
+
+def verify_incremental_eval(games:int=200, plies:int=120, seed:int=0, ev=None, fens=(chess.STARTING_FEN,)):
+    # Random-playout consistency check: incremental score must equal full() after every push and pop.
+    # Playouts start from each FEN in turn; raises AssertionError with the first mismatching FEN.
+    rng = random.Random(seed)
+    ev = ev or Evaluator()
+    checked = 0
+    def check(b):
+        if ev.evaluate(b) != ev.full(b): raise AssertionError(f"{b.fen()}: {ev.evaluate(b)} != {ev.full(b)}")
+    for i in range(games):
+        b = chess.Board(fens[i % len(fens)]); ev.reset(b)
+        for _ in range(plies):
+            moves = list(b.legal_moves)
+            if not moves: break
+            ev.push(b, rng.choice(moves)); checked += 1
+            check(b)
+        while b.move_stack:
+            ev.pop(b)
+            check(b)
+    return checked
+
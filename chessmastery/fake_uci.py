@@ -0,0 +1,79 @@
+"""Scripted stand-in for a UCI engine, for checking UciEngine without Stockfish.
+
+    python chessmastery/fake_uci.py [--log FILE] [--crash-once MARKER] [--hang-once MARKER]
+
+Answers uci/isready/position/go/stop/quit like a real engine: `go movetime N` thinks for N ms (or
+until `stop`), `go infinite` until `stop`, and the reply is the first legal move plus a ponder move.
+--log appends every command received; --crash-once / --hang-once make the first process that
+finds MARKER missing create it and then exit / go silent on its first `go`, so the restarted
+process behaves. Only needs python-chess.
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+import chess
+
+def _read(lines):
+    for line in sys.stdin: lines.put(line.strip())
+    lines.put(None)
+
+def _first_time(marker):
+    # True for the first process to get here: it creates the marker
+    if marker is None: return False
+    try:
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)); return True
+    except FileExistsError:
+        return False
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--log")
+    ap.add_argument("--crash-once")
+    ap.add_argument("--hang-once")
+    args = ap.parse_args(argv)
+    log = open(args.log, "a", encoding="utf-8", buffering=1) if args.log else None
+    say = lambda s: print(s, flush=True)
+    lines = queue.Queue()
+    threading.Thread(target=_read, args=(lines,), daemon=True).start()
+    b = chess.Board()
+    hanging = False
+    deadline = searching = None  # a search in progress ends at deadline (None: infinite) or on stop
+
+    def bestmove():
+        moves = list(b.legal_moves)
+        if not moves: return say("bestmove (none)")
+        b.push(moves[0]); reply = next(iter(b.legal_moves), None); b.pop()
+        say("info depth 1 seldepth 1 nodes 20 nps 20000 time 1")
+        say(f"bestmove {moves[0].uci()}" + (f" ponder {reply.uci()}" if reply else ""))
+
+    while True:
+        try:
+            timeout = None if not searching or deadline is None else max(0.0, deadline - time.time())
+            cmd = lines.get(timeout=timeout)
+        except queue.Empty:
+            searching = None; bestmove(); continue
+        if cmd is None or cmd == "quit": break
+        if log: log.write(cmd + "\n")
+        if hanging: continue
+        if cmd == "uci": say("id name FakeUCI"); say("uciok")
+        elif cmd == "isready": say("readyok")
+        elif cmd.startswith("position"):
+            parts = cmd.split()
+            if parts[1] == "startpos": b = chess.Board(); rest = parts[2:]
+            else: b = chess.Board(" ".join(parts[2:8])); rest = parts[8:]
+            for uci in rest[1:] if rest[:1] == ["moves"] else []: b.push_uci(uci)
+        elif cmd.startswith("go"):
+            if _first_time(args.crash_once): sys.exit(1)
+            if _first_time(args.hang_once): hanging = True; continue
+            parts = cmd.split()
+            ms = int(parts[parts.index("movetime") + 1]) if "movetime" in parts else None
+            searching, deadline = True, time.time() + ms / 1000 if ms is not None else None
+        elif cmd == "stop" and searching:
+            searching = None; bestmove()
+
+if __name__ == "__main__":
+    main()
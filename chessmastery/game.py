@@ -0,0 +1,109 @@
+"""Game state: board, move list and blitz clocks, with no graphics dependencies."""
+import time
+
+import chess
+
+from .snapshot import PositionSnapshot
+
+START_CLOCK = 5 * 60
+
+class Game:
+    # Everything a front-end needs to play one game; the 3D client renders from this object.
+    # tablebase: optional Tablebase whose WDL the position snapshot exposes.
+    # journal: optional GameJournal; an unfinished game in it is resumed, then every push/undo/reset is recorded.
+    def __init__(self, clock:float=START_CLOCK, fen:str=None, tablebase=None, journal=None):
+        self.board = chess.Board(fen) if fen else chess.Board()
+        self.tablebase = tablebase
+        self.journal = None
+        self._snapshot = None
+        self.snapshots = self.snapshot_hits = 0  # snapshots built / queries they answered
+        self.moves = []
+        self.clock = clock
+        self.clock_white = self.clock_black = clock
+        self.running = True
+        self.last_tick = time.time()
+        if journal is not None: self.attach_journal(journal)
+
+    def attach_journal(self, journal):
+        # Replays the journal's moves and clocks onto this game, then records from here on
+        st = journal.state
+        self.board.set_fen(st.fen); self.moves = []
+        for mv in st.moves: self.board.push(mv); self.moves.append(mv)
+        if st.last_clocks: self.clock_white, self.clock_black = st.last_clocks
+        self.invalidate()
+        self.running = not self.snapshot.game_over
+        self.journal = journal
+
+    @property
+    def snapshot(self):
+        # PositionSnapshot of the current position, built on first use after each change
+        if self._snapshot is None:
+            self._snapshot = PositionSnapshot(self.board, self.tablebase)
+            self.snapshots += 1
+        return self._snapshot
+
+    def invalidate(self):
+        # Call after changing self.board directly
+        if self._snapshot is not None: self.snapshot_hits += self._snapshot.hits
+        self._snapshot = None
+
+    def reset(self):
+        if self.journal is not None: self.journal.new_game(self.board.result(claim_draw=True))  # archives this game
+        self.board.reset(); self.moves = []; self.invalidate()
+        self.reset_clocks(); self.running = True
+
+    def reset_clocks(self):
+        self.clock_white = self.clock_black = self.clock
+
+    def add_time(self, secs:float, minimum:float=60):
+        self.clock_white = max(minimum, self.clock_white + secs)
+        self.clock_black = max(minimum, self.clock_black + secs)
+
+    def tick(self, now:float=None):
+        # Charge elapsed time to the side to move; the game stops when a flag falls
+        now = time.time() if now is None else now
+        dt = now - self.last_tick; self.last_tick = now
+        if not self.running: return
+        if self.board.turn: self.clock_white = max(0, self.clock_white - dt)
+        else: self.clock_black = max(0, self.clock_black - dt)
+        if self.clock_white <= 0 or self.clock_black <= 0: self.running = False
+
+    def push(self, move:chess.Move):
+        before = self.snapshot if self.journal is not None else None  # SAN from the snapshots, not Board.san()
+        self.board.push(move); self.invalidate()
+        self.moves.append(move)
+        if self.snapshot.game_over: self.running = False
+        if self.journal is not None:
+            self.journal.record_move(move, before.san(move, self.snapshot), self.clock_white, self.clock_black,
+                                     self.snapshot.eval)
+
+    def undo(self):
+        if not self.moves: return None
+        self.board.pop(); self.invalidate(); self.running = True
+        if self.journal is not None: self.journal.record_undo(self.clock_white, self.clock_black)
+        return self.moves.pop()
+
+    def status(self):
+        # i18n key for the status line, or None
+        return self.snapshot.status()
+
+    def legal_targets_from(self, fr:int):
+        return self.snapshot.targets_from(fr)
+
+    def is_promotion(self, fr:int, to:int):
+        p = self.board.piece_at(fr)
+        return bool(p and p.piece_type == chess.PAWN and to // 8 in (0, 7))
+
+    def try_move(self, fr:int, to:int, promotion:int=None):
+        mv = chess.Move(fr, to, promotion=promotion)
+        if self.snapshot.is_legal(mv):
+            self.push(mv)
+            return mv
+        return None
+
+    def snapshot_stats(self):
+        # Movegen-free queries per built snapshot (each would otherwise have generated moves)
+        hits = self.snapshot_hits + (self._snapshot.hits if self._snapshot is not None else 0)
+        return {"snapshots": self.snapshots, "hits": hits, "hits_per_ply": hits / self.snapshots if self.snapshots else 0.0}
+
+def format_time(t): m = int(t)//60; s = int(t)%60; return f"{m:02d}:{s:02d}"
@@ -0,0 +1,29 @@
+"""Minimal i18n for UI strings."""
+LANGS = ["EN","ES","ID","RU","DE"]
+
+STRINGS = {
+    "turn":      ["Turn","Turno","Giliran","Ход","Zug"],
+    "white":     ["White","Blancas","Putih","Белые","Weiß"],
+    "black":     ["Black","Negras","Hitam","Чёрные","Schwarz"],
+    "check":     ["Check","Jaque","Skak","Шах","Schach"],
+    "mate":      ["Checkmate","Jaque mate","Skak Mat","Мат","Schachmatt"],
+    "stalemate": ["Stalemate","Tablas por ahogado","Paten","Пат","Patt"],
+    "help_hdr":  ["Controls","Controles","Kontrol","Управление","Steuerung"],
+    "help_body": [
+        "- Left click: select / move\n- Right click: cancel\n- A: toggle Coach\n- F1: AI plays Black\n- F2: AI strength\n- TAB: flip board\n- N: new game   Backspace: undo\n- P: export PGN\n- +/- : change clocks   R: reset\n- 1..3: switch theme   L: language\n- F3: performance HUD   F4: save trace",
+        "- Clic izq: seleccionar / mover\n- Clic der: cancelar\n- A: Coach\n- F1: IA juega con negras\n- F2: Fuerza IA\n- TAB: girar tablero\n- N: nueva   Retroceso: deshacer\n- P: exportar PGN\n- +/- : reloj   R: reset\n- 1..3: tema   L: idioma\n- F3: HUD rendimiento   F4: guardar traza",
+        "- Klik kiri: pilih / gerak\n- Klik kanan: batal\n- A: Coach\n- F1: AI main Hitam\n- F2: Kekuatan AI\n- TAB: balik papan\n- N: baru   Backspace: undo\n- P: ekspor PGN\n- +/- : jam   R: reset\n- 1..3: tema   L: bahasa\n- F3: HUD performa   F4: simpan trace",
+        "- ЛКМ: выбрать / ход\n- ПКМ: отмена\n- A: Тренер\n- F1: ИИ играет чёрными\n- F2: Сила ИИ\n- TAB: перевернуть доску\n- N: новая   Backspace: отменить\n- P: экспорт PGN\n- +/- : часы   R: сброс\n- 1..3: тема   L: язык\n- F3: HUD производительности   F4: сохранить трассу",
+        "- Linksklick: wählen / ziehen\n- Rechtsklick: abbrechen\n- A: Coach\n- F1: KI spielt Schwarz\n- F2: KI-Stärke\n- TAB: Brett drehen\n- N: neu   Rück: zurück\n- P: PGN export\n- +/- : Uhren   R: reset\n- 1..3: Theme   L: Sprache\n- F3: Performance-HUD   F4: Trace speichern",
+    ],
+    "coach_hdr": ["Coach","Coach","Pelatih","Тренер","Coach"],
+    "coach_ok":  ["Good plan, keep tempo.","Buen plan, mantén el ritmo.","Rencana bagus, jaga tempo.","Хороший план, держите темп.","Guter Plan, Tempo halten."],
+    "ai_on":     ["AI Black: ON","IA Negras: ON","AI Hitam: ON","ИИ чёрные: ВКЛ","KI Schwarz: AN"],
+    "ai_off":    ["AI Black: OFF","IA Negras: OFF","AI Hitam: OFF","ИИ чёрные: ВЫКЛ","KI Schwarz: AUS"],
+    "ai_lvl":    ["AI Level","Nivel IA","Level AI","Уровень ИИ","KI-Stufe"],
+    "game_over": ["Game Over","Partida terminada","Permainan selesai","Игра окончена","Partie beendet"],
+    "save_pgn":  ["Saved PGN ->","PGN guardado ->","PGN disimpan ->","PGN сохранён ->","PGN gespeichert ->"],
+}
+
+def T(key, lang:int=0):
+    return STRINGS[key][lang]
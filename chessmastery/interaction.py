@@ -0,0 +1,61 @@
+"""Board interaction state machine: selection, moves and pending promotions, driven by input events.
+
+Nothing here waits or draws. click()/choose()/key()/cancel() return an action for the front-end
+to apply; a promotion parks in PROMOTION until a piece is chosen, so the frame loop keeps running.
+Actions: ("select", square, targets), ("move", move), ("promote", from, to), ("clear",), ("ignored",).
+"""
+import chess
+
+IDLE, SELECTED, PROMOTION = "idle", "selected", "promotion"
+PROMOTION_KEYS = {"q": chess.QUEEN, "r": chess.ROOK, "b": chess.BISHOP, "n": chess.KNIGHT}
+
+class Interaction:
+    def __init__(self, game):
+        self.game = game
+        self.state = IDLE
+        self.selected = None
+        self.targets = set()
+        self.pending = None  # (from, to) waiting for a promotion piece
+
+    def reset(self):
+        self.state = IDLE; self.selected = None; self.targets = set(); self.pending = None
+        return ("clear",)
+
+    def _select(self, sq:int):
+        p = self.game.board.piece_at(sq)
+        if p and p.color == self.game.board.turn:
+            self.state, self.selected = SELECTED, sq
+            self.targets = self.game.legal_targets_from(sq)
+            return ("select", sq, self.targets)
+        return self.reset()
+
+    def click(self, sq:int):
+        if self.state == PROMOTION: return ("ignored",)  # the piece picker is modal
+        if self.state == IDLE:
+            p = self.game.board.piece_at(sq)
+            return self._select(sq) if p and p.color == self.game.board.turn else ("ignored",)
+        fr = self.selected
+        if sq in self.targets:
+            if self.game.is_promotion(fr, sq):
+                self.state, self.pending = PROMOTION, (fr, sq)
+                return ("promote", fr, sq)
+            self.reset()
+            return ("move", chess.Move(fr, sq))
+        return self._select(sq)
+
+    def choose(self, piece_type:int):
+        if self.state != PROMOTION: return ("ignored",)
+        fr, to = self.pending
+        mv = chess.Move(fr, to, promotion=piece_type)
+        self.reset()
+        return ("move", mv) if self.game.snapshot.is_legal(mv) else ("clear",)
+
+    def key(self, key:str):
+        # Keyboard while the picker is open: q/r/b/n choose, escape cancels; other keys are not ours
+        if self.state != PROMOTION: return None
+        if key in PROMOTION_KEYS: return self.choose(PROMOTION_KEYS[key])
+        if key == "escape": return self.reset()
+        return None
+
+    def cancel(self):
+        return self.reset()
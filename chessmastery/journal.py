@@ -0,0 +1,205 @@
+"""Append-only, crash-safe game journal with a live PGN next to it.
+
+    python -m chessmastery.journal show ~/.chessmastery/current.cmj
+    python -m chessmastery.journal export ~/.chessmastery/archive all_games.pgn
+
+A journal is a small header (magic, start FEN) followed by fixed-size records: one per move
+(move, SAN, both clocks, eval), a tombstone per undo and an end record with the result.
+Records are written straight to the file descriptor and fsync'ed in batches, and each carries
+a CRC32, so after a crash a torn last record is detected and dropped on reopen. Replaying a
+journal is a struct.iter_unpack over the file; exporting stored games only joins the stored
+SAN strings, so nothing is re-parsed or re-validated.
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+
+import chess
+
+from .pgn import LivePgn, movetext_token, pgn_headers
+
+JOURNAL_DIR = os.environ.get("CHESS_JOURNAL_DIR") or os.path.join(os.path.expanduser("~"), ".chessmastery")
+MAGIC = b"CMJRNL01"
+HEADER = struct.Struct("<8sdH")           # magic, start time, FEN length (FEN bytes follow)
+RECORD = struct.Struct("<BxH8sIIidI")     # kind, move, SAN, white/black clock ms, eval cp, time, crc32
+MOVE, UNDO, END = 1, 2, 3
+FSYNC_EVERY = 8          # records between fsyncs
+FSYNC_INTERVAL = 1.0     # ... or seconds, whichever comes first
+
+def pack_move(mv:chess.Move):
+    return mv.from_square | mv.to_square << 6 | (mv.promotion or 0) << 12
+
+def unpack_move(m:int):
+    return chess.Move(m & 63, (m >> 6) & 63, (m >> 12) & 7 or None)
+
+class JournalState:
+    # A journal replayed: the live move list (undos applied) with the SAN, clocks and eval per move
+    def __init__(self, fen:str, started:float):
+        self.fen, self.started = fen, started
+        self.moves, self.sans, self.clocks, self.evals = [], [], [], []
+        self.result = None
+        self.records = 0
+        self.last_clocks = None  # clocks of the last move or undo record (undos restore these too)
+
+    def apply(self, kind:int, move:int, san:bytes, wms:int, bms:int, ev:int):
+        self.records += 1
+        if kind in (MOVE, UNDO): self.last_clocks = (wms / 1000, bms / 1000)
+        if kind == MOVE:
+            self.moves.append(unpack_move(move)); self.sans.append(san.rstrip(b"\0").decode())
+            self.clocks.append((wms / 1000, bms / 1000)); self.evals.append(ev)
+        elif kind == UNDO and self.moves:
+            self.moves.pop(); self.sans.pop(); self.clocks.pop(); self.evals.pop()
+        elif kind == END:
+            self.result = san.rstrip(b"\0").decode()
+
+    def board(self):
+        b = chess.Board(self.fen)
+        for mv in self.moves: b.push(mv)
+        return b
+
+    def pgn(self, headers:dict=None):
+        result = self.result or "*"
+        movetext = "".join(movetext_token(san, i) for i, san in enumerate(self.sans))
+        return pgn_headers(dict(headers or {}, Result=result), self.fen) + movetext + result + "\n\n"
+
+def read_journal(path:str):
+    # (JournalState, byte length of the valid prefix); stops at the first torn or corrupt record
+    with open(path, "rb") as f: data = f.read()
+    magic, started, n = HEADER.unpack_from(data)
+    if magic != MAGIC: raise ValueError(f"{path}: not a game journal")
+    start = HEADER.size + n
+    state = JournalState(data[HEADER.size:start].decode(), started)
+    end = start + (len(data) - start) // RECORD.size * RECORD.size
+    valid = start
+    for rec in struct.iter_unpack(RECORD.format, data[start:end]):
+        if zlib.crc32(RECORD.pack(*rec[:-1], 0)) != rec[-1]: break
+        state.apply(*rec[:6])
+        valid += RECORD.size
+    return state, valid
+
+class GameJournal:
+    # Journal of the game in progress at `path`, plus a LivePgn at path with a .pgn suffix.
+    # Opening an existing unfinished journal resumes it (see state); finished games are moved
+    # to archive_dir by new_game().
+    def __init__(self, path:str=None, fen:str=chess.STARTING_FEN, archive_dir:str=None,
+                 fsync_every:int=FSYNC_EVERY, fsync_interval:float=FSYNC_INTERVAL):
+        self.path = path or os.path.join(JOURNAL_DIR, "current.cmj")
+        self.archive_dir = archive_dir or os.path.join(os.path.dirname(self.path) or ".", "archive")
+        self.fsync_every, self.fsync_interval = fsync_every, fsync_interval
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.fd = None
+        self.pgn = None
+        self.state = None
+        if os.path.exists(self.path):
+            try:
+                self.state, valid = read_journal(self.path)
+            except (ValueError, struct.error, UnicodeDecodeError):
+                self.state = None
+            if self.state is not None and self.state.result is None:
+                self._open(valid)
+                return
+            if self.state is not None: self.archive()
+        self._create(fen)
+
+    def _create(self, fen:str):
+        raw = fen.encode()
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, time.time(), len(raw)) + raw)
+            f.flush(); os.fsync(f.fileno())
+        self.state = JournalState(fen, time.time())
+        self._open(None)
+
+    def _open(self, valid):
+        if valid is not None: os.truncate(self.path, valid)  # drop a torn tail so records stay aligned
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+        self.pending = 0; self.last_sync = time.time()
+        self.pgn = LivePgn(os.path.splitext(self.path)[0] + ".pgn", self.state.fen)
+        for san in self.state.sans: self.pgn.push(san)
+
+    def _append(self, kind:int, move:int=0, san:str="", clock_white:float=0, clock_black:float=0, ev:int=0):
+        fields = (kind, move, san.encode()[:8], int(clock_white * 1000), int(clock_black * 1000),
+                  max(-2**31, min(2**31 - 1, int(ev))), time.time())
+        os.write(self.fd, RECORD.pack(*fields, zlib.crc32(RECORD.pack(*fields, 0))))
+        self.state.apply(*fields[:6])
+        self.pending += 1
+        if self.pending >= self.fsync_every or time.time() - self.last_sync >= self.fsync_interval: self.sync()
+
+    def record_move(self, move:chess.Move, san:str, clock_white:float, clock_black:float, ev:int=0):
+        self._append(MOVE, pack_move(move), san, clock_white, clock_black, ev)
+        self.pgn.push(san)
+
+    def record_undo(self, clock_white:float, clock_black:float):
+        self._append(UNDO, clock_white=clock_white, clock_black=clock_black)
+        self.pgn.pop()
+
+    def record_end(self, result:str):
+        self._append(END, san=result)
+        self.pgn.finish(result)
+        self.sync()
+
+    def sync(self):
+        if self.fd is not None and self.pending:
+            os.fsync(self.fd); self.pending = 0
+        self.last_sync = time.time()
+
+    def archive(self):
+        # Move the current journal (and its PGN) into archive_dir under its start time
+        os.makedirs(self.archive_dir, exist_ok=True)
+        started = self.state.started if self.state is not None else time.time()
+        name = time.strftime("%Y%m%d-%H%M%S", time.localtime(started)) + f"-{int(started * 1000) % 1000:03d}"
+        while os.path.exists(os.path.join(self.archive_dir, name + ".cmj")): name += "-1"
+        base = os.path.splitext(self.path)[0]
+        for src, ext in ((self.path, ".cmj"), (base + ".pgn", ".pgn")):
+            if os.path.exists(src): os.replace(src, os.path.join(self.archive_dir, name + ext))
+
+    def new_game(self, result:str, fen:str=chess.STARTING_FEN):
+        # Close the game with `result`, archive it if it has moves, and start an empty journal
+        if self.state.moves:
+            self.record_end(result)
+            self.close(); self.archive()
+        else:
+            self.close()
+        self._create(fen)
+
+    def close(self):
+        if self.fd is not None:
+            self.sync(); os.close(self.fd); self.fd = None
+        if self.pgn is not None:
+            self.pgn.close(); self.pgn = None
+
+def archived_games(archive_dir:str):
+    # Journal paths in archive_dir, oldest first (names sort by start time)
+    if not os.path.isdir(archive_dir): return []
+    return [os.path.join(archive_dir, n) for n in sorted(os.listdir(archive_dir)) if n.endswith(".cmj")]
+
+def export_archive(archive_dir:str, out_path:str):
+    # One PGN database from every archived journal, straight from the stored SAN
+    n = 0
+    with open(out_path, "w", encoding="utf-8") as out:
+        for path in archived_games(archive_dir):
+            state, _ = read_journal(path)
+            out.write(state.pgn({"Date": time.strftime("%Y.%m.%d", time.localtime(state.started))}))
+            n += 1
+    return n
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("show", help="print a journal as PGN")
+    p.add_argument("journal")
+    p = sub.add_parser("export", help="write every archived journal in a directory to one PGN file")
+    p.add_argument("archive_dir"); p.add_argument("output")
+    args = ap.parse_args(argv)
+    if args.cmd == "show":
+        state, _ = read_journal(args.journal)
+        sys.stdout.write(state.pgn())
+    else:
+        t = time.perf_counter()
+        n = export_archive(args.archive_dir, args.output)
+        print(f"{n} games -> {args.output} in {time.perf_counter() - t:.2f} s")
+
+if __name__ == "__main__":
+    main()
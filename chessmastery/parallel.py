@@ -0,0 +1,167 @@
+"""Lazy-SMP search: helper processes search the same root and share one transposition table.
+
+The table lives in shared memory as pairs of uint64 words (key ^ data, data), so helpers read and
+write it without locks; a torn or concurrently overwritten slot fails the key check and is a miss.
+The main process runs a normal Searcher on the shared table and its move is the one played; helpers
+start at staggered depths so they fill the table with entries the main search can cut off on.
+"""
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import chess
+
+from .search import SEARCH_MAX_DEPTH, SEARCH_THREADS, SEARCH_TIME_MS, TT_BUCKETS, Searcher
+
+# data word: depth 8 bits | flag 2 | score + SCORE_BIAS 20 | move 16 | age 8
+SCORE_BIAS = 1 << 19
+MOVE_SET = 1 << 15
+HELPER_TIMEOUT = 10.0  # seconds for helpers to report back once stopped (covers a slow first start)
+
+def _pack_move(mv):
+    if mv is None: return 0
+    return MOVE_SET | mv.from_square | mv.to_square << 6 | (mv.promotion or 0) << 12
+
+def _unpack_move(m:int):
+    if not m & MOVE_SET: return None
+    return chess.Move(m & 63, (m >> 6) & 63, (m >> 12) & 7 or None)
+
+class SharedTranspositionTable:
+    # Drop-in for TranspositionTable (same probe/store/new_search/clear) backed by shared memory.
+    # Word 0 holds the search age so helper processes age entries like the owner does.
+    def __init__(self, buckets:int=TT_BUCKETS, name:str=None):
+        assert buckets & (buckets - 1) == 0, "bucket count must be a power of two"
+        self.mask = buckets - 1
+        self.owner = name is None
+        size = 8 * (1 + 4 * buckets)
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.words = self.shm.buf.cast("Q")
+        if self.owner: self.clear()
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def age(self):
+        return self.words[0]
+
+    def clear(self):
+        self.shm.buf[:] = bytes(len(self.shm.buf))
+
+    def new_search(self):
+        if self.owner: self.words[0] = (self.words[0] + 1) & 0xFF
+
+    def probe(self, key:int):
+        w = self.words
+        i = 1 + ((key & self.mask) << 2)
+        for j in (i, i + 2):
+            data = w[j + 1]
+            if data and w[j] ^ data == key:
+                return (key, data & 0xFF, ((data >> 10) & 0xFFFFF) - SCORE_BIAS, (data >> 8) & 3,
+                        _unpack_move((data >> 30) & 0xFFFF), data >> 46)
+        return None
+
+    def store(self, key:int, depth:int, score:int, flag:int, move):
+        w = self.words
+        age = w[0]
+        data = depth | flag << 8 | (score + SCORE_BIAS) << 10 | _pack_move(move) << 30 | age << 46
+        i = 1 + ((key & self.mask) << 2)
+        old = w[i + 1]
+        if not old or w[i] ^ old == key or depth >= old & 0xFF or old >> 46 != age:
+            w[i], w[i + 1] = key ^ data, data
+        else:
+            w[i + 2], w[i + 3] = key ^ data, data
+
+    def close(self):
+        self.words.release()
+        self.shm.close()
+        if self.owner: self.shm.unlink()
+
+# Helper-process state, set up once per process by _init_helper
+_helper = None
+
+def _init_helper(tt_name:str, buckets:int, stop):
+    global _helper
+    tt = SharedTranspositionTable(buckets, name=tt_name)
+    _helper = (Searcher(tt=tt), stop)
+
+def _helper_search(root_fen:str, moves, index:int, max_depth:int, evaluator, use_tablebase:bool):
+    # Searches until the main process sets the shared stop event; returns (nodes, completed depth)
+    searcher, stop = _helper
+    if evaluator is not None: searcher.ev = evaluator
+    if use_tablebase:
+        from .tablebase import default_tablebase
+        searcher.tb = default_tablebase()
+    else:
+        searcher.tb = None
+    b = chess.Board(root_fen)
+    for uci in moves: b.push_uci(uci)
+    searcher.search(b, movetime_ms=None, max_depth=max_depth, stop=stop, min_depth=1 + (index & 1))
+    return searcher.nodes, searcher.depth
+
+def _mp_context():
+    # fork while this process is still single-threaded (it keeps helpers from re-running an unguarded
+    # __main__); forking a threaded process can deadlock, so otherwise forkserver/spawn, which need
+    # the `if __name__ == "__main__"` guard. The 3D client has that guard and starts its helpers
+    # before any thread.
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods and threading.active_count() == 1: return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+class ParallelSearcher(Searcher):
+    # Searcher whose search() also runs threads-1 helper processes on a shared table.
+    # Helpers start on the first search (or an earlier start()) and live until close();
+    # threads=1 behaves like Searcher.
+    def __init__(self, threads:int=SEARCH_THREADS, tt_buckets:int=TT_BUCKETS, evaluator=None, tablebase=None, **opts):
+        self.threads = max(1, threads)
+        self.buckets = tt_buckets
+        super().__init__(evaluator=evaluator, tablebase=tablebase, tt=SharedTranspositionTable(tt_buckets), **opts)
+        self.pool = None
+        self.stop_helpers = None
+        self.helper_nodes = 0
+        self.helper_depths = []
+
+    def start(self):
+        if self.pool is None and self.threads > 1:
+            ctx = _mp_context()
+            self.stop_helpers = ctx.Event()
+            self.pool = ctx.Pool(self.threads - 1, initializer=_init_helper,
+                                 initargs=(self.tt.name, self.buckets, self.stop_helpers))
+
+    @property
+    def total_nodes(self):
+        return self.nodes + self.helper_nodes
+
+    def search(self, b:chess.Board, movetime_ms=SEARCH_TIME_MS, max_nodes=None, max_depth=SEARCH_MAX_DEPTH, stop=None,
+               min_depth:int=1):
+        self.helper_nodes = 0; self.helper_depths = []
+        if self.threads == 1:
+            return super().search(b, movetime_ms, max_nodes, max_depth, stop, min_depth)
+        self.start()
+        self.stop_helpers.clear()
+        root = b.root()
+        moves = [mv.uci() for mv in b.move_stack]
+        jobs = [self.pool.apply_async(_helper_search, (root.fen(), moves, i, max_depth, self.ev, self.tb is not None))
+                for i in range(1, self.threads)]
+        try:
+            return super().search(b, movetime_ms, max_nodes, max_depth, stop, min_depth)
+        finally:
+            self.stop_helpers.set()
+            deadline = time.monotonic() + HELPER_TIMEOUT
+            try:
+                for job in jobs:
+                    nodes, depth = job.get(max(0.0, deadline - time.monotonic()))
+                    self.helper_nodes += nodes; self.helper_depths.append(depth)
+            except multiprocessing.TimeoutError:
+                # Helpers never came up (e.g. a spawned child failing to import an unguarded __main__)
+                # or are wedged: drop them and search single-threaded from now on
+                self.pool.terminate(); self.pool = None
+                self.threads = 1
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate(); self.pool.join()
+            self.pool = None
+        self.tt.close()
@@ -0,0 +1,66 @@
+"""PGN export: whole games via python-chess, or a live file updated per move."""
+import chess
+
+def game_to_pgn(moves, root:chess.Board=None):
+    import chess.pgn  # pulls in chess.engine/asyncio; only paid when exporting
+    game = chess.pgn.Game()
+    if root is not None and root.fen() != chess.STARTING_FEN: game.setup(root)
+    node = game
+    for mv in moves:
+        node = node.add_variation(mv)
+    return game
+
+def export_pgn(moves, path="game.pgn", root:chess.Board=None):
+    with open(path, "w", encoding="utf-8") as f:
+        print(game_to_pgn(moves, root), file=f, end="\n\n")
+    return path
+
+def movetext_token(san:str, ply:int):
+    # "12. Nf3 " for White, "Nc6 " for Black; a line break every 8 full moves keeps lines short
+    if ply % 2 == 0: return f"{ply // 2 + 1}. {san} "
+    return f"{san}\n" if (ply // 2 + 1) % 8 == 0 else f"{san} "
+
+def pgn_headers(headers:dict, fen:str=chess.STARTING_FEN):
+    tags = {"Event": "ChessMastery3D", "Site": "?", "Date": "????.??.??", "Round": "?", "White": "?", "Black": "?",
+            "Result": "*", **headers}
+    if fen != chess.STARTING_FEN: tags.update(SetUp="1", FEN=fen)
+    return "".join(f'[{k} "{v}"]\n' for k, v in tags.items()) + "\n"
+
+class LivePgn:
+    # PGN file kept current move by move: push() overwrites the "*" terminator with the new token,
+    # pop() truncates back to the previous token, so each update costs O(1) whatever the game length.
+    def __init__(self, path:str, fen:str=chess.STARTING_FEN, headers:dict=None):
+        self.path, self.fen, self.headers = path, fen, dict(headers or {})
+        self.f = open(path, "w+b")
+        self.f.write(pgn_headers(self.headers, fen).encode())
+        self.offsets = []
+        self.start = self.pos = self.f.tell()
+        self.result = "*"
+        self._write_tail()
+
+    def _write_tail(self):
+        self.f.seek(self.pos); self.f.write(f"{self.result}\n\n".encode()); self.f.truncate(); self.f.flush()
+
+    def push(self, san:str):
+        token = movetext_token(san, len(self.offsets)).encode()
+        self.offsets.append(self.pos)
+        self.f.seek(self.pos); self.f.write(token); self.pos += len(token)
+        self._write_tail()
+
+    def pop(self):
+        if not self.offsets: return
+        self.pos = self.offsets.pop()
+        self._write_tail()
+
+    def finish(self, result:str):
+        # Once per game: the Result tag changes length, so the file is rewritten
+        self.f.seek(self.start); movetext = self.f.read(self.pos - self.start)
+        self.headers["Result"] = self.result = result
+        header = pgn_headers(self.headers, self.fen).encode()
+        shift = len(header) - self.start
+        self.f.seek(0); self.f.write(header + movetext)
+        self.start += shift; self.pos += shift; self.offsets = [o + shift for o in self.offsets]
+        self._write_tail()
+
+    def close(self):
+        self.f.close()
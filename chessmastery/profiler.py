@@ -0,0 +1,114 @@
+"""Lightweight hot-path timers, frame-time percentiles and Chrome trace-event export.
+
+    prof = Profiler(enabled=True)
+    @prof.timed("evaluate")
+    def f(): ...
+    with prof.span("search", depth=6): ...
+    prof.export_chrome("trace.json")   # open in chrome://tracing or https://ui.perfetto.dev
+
+Disabled, a span is one attribute check plus a shared no-op context manager.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+class _NullSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("prof", "name", "args", "t")
+    def __init__(self, prof, name, args):
+        self.prof, self.name, self.args = prof, name, args
+    def __enter__(self):
+        self.t = time.perf_counter(); return self
+    def __exit__(self, *exc):
+        self.prof.record(self.name, self.t, time.perf_counter(), self.args)
+        return False
+
+class Profiler:
+    # Events are kept in a bounded ring buffer; frame times in a rolling window for the HUD.
+    def __init__(self, enabled:bool=False, max_events:int=200_000, window:int=600):
+        self.enabled = enabled
+        self.events = deque(maxlen=max_events)   # (ph, name, start s, end s, tid, args)
+        self.totals = {}                         # name -> [calls, total s, max s], updated per span
+        self.lock = threading.Lock()             # spans arrive from the AI worker thread too
+        self.frame_times = deque(maxlen=window)  # seconds
+        self.last_frame = None
+        self.pid = os.getpid()
+
+    def record(self, name:str, start:float, end:float, args=None):
+        self.events.append(("X", name, start, end, threading.get_ident(), args))
+        dt = end - start
+        with self.lock:
+            t = self.totals.get(name)
+            if t is None: self.totals[name] = [1, dt, dt]
+            else:
+                t[0] += 1; t[1] += dt
+                if dt > t[2]: t[2] = dt
+
+    def span(self, name:str, **args):
+        return _Span(self, name, args or None) if self.enabled else NULL_SPAN
+
+    def timed(self, name:str=None):
+        # Decorator: records a span per call while enabled
+        def wrap(fn):
+            label = name or fn.__name__
+            @functools.wraps(fn)
+            def inner(*a, **k):
+                if not self.enabled: return fn(*a, **k)
+                t = time.perf_counter()
+                try: return fn(*a, **k)
+                finally: self.record(label, t, time.perf_counter())
+            return inner
+        return wrap
+
+    def counter(self, name:str, **values):
+        # Numeric series (e.g. search depth/nodes/nps) shown as a counter track in the trace
+        if self.enabled:
+            t = time.perf_counter()
+            self.events.append(("C", name, t, t, threading.get_ident(), values))
+
+    def frame(self, now:float=None):
+        # Call once per frame; the gap since the previous call is the frame time (update + render)
+        now = time.perf_counter() if now is None else now
+        if self.enabled and self.last_frame is not None:
+            self.frame_times.append(now - self.last_frame)
+            self.record("frame", self.last_frame, now)
+        self.last_frame = now
+
+    def percentiles(self, ps=(50, 95, 99)):
+        # Nearest-rank frame-time percentiles in milliseconds
+        xs = sorted(self.frame_times)
+        if not xs: return {p: 0.0 for p in ps}
+        return {p: 1000 * xs[min(len(xs) - 1, max(0, -(-p * len(xs) // 100) - 1))] for p in ps}
+
+    def summary(self):
+        # Total/mean/max milliseconds per span name since the last clear(); O(names), not O(events)
+        with self.lock:
+            totals = [(name, *t) for name, t in self.totals.items()]
+        return {name: {"calls": n, "total_ms": 1000 * total, "max_ms": 1000 * mx, "mean_ms": 1000 * total / n}
+                for name, n, total, mx in totals}
+
+    def chrome_events(self):
+        events = []
+        for ph, name, start, end, tid, args in list(self.events):
+            e = {"name": name, "ph": ph, "ts": start * 1e6, "pid": self.pid, "tid": tid}
+            if ph == "X": e["dur"] = (end - start) * 1e6
+            if args: e["args"] = args
+            events.append(e)
+        return events
+
+    def export_chrome(self, path:str="trace.json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"}, f)
+        return path
+
+    def clear(self):
+        self.events.clear(); self.frame_times.clear(); self.last_frame = None
+        with self.lock: self.totals.clear()
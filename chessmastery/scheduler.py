@@ -0,0 +1,44 @@
+"""Frame-loop scheduler: deferred calls, timers and background-job completions, run once per frame."""
+import heapq
+import itertools
+import time
+from collections import deque
+
+class FrameScheduler:
+    # The front-end calls run() from its per-frame update. Callbacks never block and never run a
+    # nested frame loop; whatever they schedule runs on a later frame.
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.ready = deque()
+        self.timers = []        # heap of (due, seq, fn, args)
+        self.waits = []         # (handle with done(), fn): fn(handle) once done
+        self.seq = itertools.count()
+
+    def call_soon(self, fn, *args):
+        self.ready.append((fn, args))
+
+    def call_later(self, delay:float, fn, *args):
+        heapq.heappush(self.timers, (self.clock() + delay, next(self.seq), fn, args))
+
+    def when_done(self, handle, fn):
+        self.waits.append((handle, fn))
+
+    def pending(self):
+        return len(self.ready) + len(self.timers) + len(self.waits)
+
+    def run(self, now:float=None):
+        # Runs what is due this frame; returns the number of callbacks run
+        now = self.clock() if now is None else now
+        while self.timers and self.timers[0][0] <= now:
+            _, _, fn, args = heapq.heappop(self.timers); self.ready.append((fn, args))
+        if self.waits:
+            still = []
+            for handle, fn in self.waits:
+                if handle.done(): self.ready.append((fn, (handle,)))
+                else: still.append((handle, fn))
+            self.waits = still
+        n = len(self.ready)
+        for _ in range(n):
+            fn, args = self.ready.popleft()
+            fn(*args)
+        return n
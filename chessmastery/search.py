@@ -0,0 +1,294 @@
+"""Iterative-deepening negamax with a transposition table, move ordering and quiescence."""
+import os
+import time
+
+import chess
+import chess.polyglot
+
+from .evaluation import PIECE_VAL, SEARCH_MOBILITY, Evaluator
+from .tablebase import wdl_score
+
+MATE = 99999
+MATE_BOUND = MATE - 1000     # scores beyond this are "mate in N plies"
+SEARCH_TIME_MS = 300         # level 3+ budget per move
+SEARCH_MAX_DEPTH = 32
+TT_BUCKETS = 1 << 16         # x2 entries; power of two
+PV_MOVES_MAX = 4096          # remembered PV moves, oldest dropped first
+SEARCH_THREADS = int(os.environ.get("CHESS_SEARCH_THREADS", "1"))  # level 3 search processes (parallel.py)
+
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+class SearchAborted(Exception):
+    pass
+
+class TranspositionTable:
+    # Bounded table keyed by polyglot Zobrist hash. Each bucket has two slots:
+    # slot 0 is depth-preferred (only replaced by a deeper/newer/same-key result),
+    # slot 1 is always-replace, so shallow recent results still get cached.
+    def __init__(self, buckets:int=TT_BUCKETS):
+        assert buckets & (buckets - 1) == 0, "bucket count must be a power of two"
+        self.mask = buckets - 1
+        self.slots = [None] * (2 * buckets)
+        self.age = 0
+
+    def clear(self):
+        self.slots = [None] * len(self.slots); self.age = 0
+
+    def new_search(self):
+        self.age += 1
+
+    def probe(self, key:int):
+        i = (key & self.mask) << 1
+        e = self.slots[i]
+        if e is not None and e[0] == key: return e
+        e = self.slots[i + 1]
+        if e is not None and e[0] == key: return e
+        return None
+
+    def store(self, key:int, depth:int, score:int, flag:int, move):
+        i = (key & self.mask) << 1
+        entry = (key, depth, score, flag, move, self.age)
+        old = self.slots[i]
+        if old is None or old[0] == key or depth >= old[1] or old[5] != self.age:
+            self.slots[i] = entry
+        else:
+            self.slots[i + 1] = entry
+
+def _score_to_tt(score:int, ply:int):
+    # Mate scores are stored relative to the node, not the root
+    if score > MATE_BOUND: return score + ply
+    if score < -MATE_BOUND: return score - ply
+    return score
+
+def _score_from_tt(score:int, ply:int):
+    if score > MATE_BOUND: return score - ply
+    if score < -MATE_BOUND: return score + ply
+    return score
+
+DELTA_MARGIN = 200           # quiescence: skip captures that cannot lift the score near alpha
+
+# Move-ordering tiers (higher is searched first)
+ORDER_HASH, ORDER_CAPTURE, ORDER_KILLER = 1 << 30, 1 << 20, 1 << 19
+
+class Searcher:
+    # Keeps its transposition table and principal variation between calls, so consecutive
+    # AI moves in one game start from the previous search's results. Call reset() on new game.
+    # ordering/quiescence can be switched off to measure what they save (see search_report).
+    def __init__(self, tt_buckets:int=TT_BUCKETS, ordering:bool=True, quiescence:bool=True, evaluator:Evaluator=None,
+                 tablebase=None, tt=None):
+        self.tt = TranspositionTable(tt_buckets) if tt is None else tt  # tt: e.g. a SharedTranspositionTable
+        self.tb = tablebase  # Tablebase: exact WDL scores for covered positions below the root
+        self.ev = evaluator or Evaluator(mobility=SEARCH_MOBILITY)
+        self.ordering = ordering
+        self.quiescence = quiescence
+        self.pv_moves = {}   # zobrist key -> PV move played from that position
+        self.pv = []
+        self.killers = [[None, None] for _ in range(SEARCH_MAX_DEPTH + 2)]
+        self.hist = [0] * (2 * 64 * 64)   # history heuristic, [color][from][to]
+        self.nodes = self.qnodes = self.tb_hits = 0
+        self.depth_nodes = []  # nodes (incl. quiescence) spent on each completed iteration
+        self.depth = 0
+        self.score = 0
+        self.elapsed = 0.0
+
+    def reset(self):
+        self.tt.clear(); self.pv_moves = {}; self.pv = []
+        self.killers = [[None, None] for _ in range(SEARCH_MAX_DEPTH + 2)]
+        self.hist = [0] * len(self.hist)
+
+    def search(self, b:chess.Board, movetime_ms=SEARCH_TIME_MS, max_nodes=None, max_depth=SEARCH_MAX_DEPTH, stop=None,
+               min_depth:int=1):
+        # Returns the best move of the deepest fully completed iteration (depth 1 always completes).
+        # min_depth > 1 skips the first iterations (Lazy-SMP helpers start deeper than the main thread).
+        self.tt.new_search()
+        self.nodes = self.qnodes = self.tb_hits = 0; self.depth_nodes = []; self.depth = 0; self.score = 0
+        t0 = time.perf_counter()
+        self.deadline = time.time() + movetime_ms / 1000 if movetime_ms else None
+        self.max_nodes = max_nodes
+        self.stop = stop  # optional threading.Event-like cancel flag
+        self.seen = self._game_keys(b)  # repetition counts: game so far + current search path
+        self.hist = [h >> 1 for h in self.hist]  # age history scores from earlier moves
+        self.ev.reset(b)
+        best = None
+        for depth in range(max(min_depth, 1), min(max_depth, SEARCH_MAX_DEPTH) + 1):
+            self.lines = [[] for _ in range(depth + 2)]
+            start = self.nodes
+            try:
+                score = self.negamax(b, depth, -MATE - 1, MATE + 1, 0, depth > 1)
+            except SearchAborted:
+                break
+            if not self.lines[0]: break
+            self.pv = self.lines[0]; best = self.pv[0]
+            self.depth, self.score = depth, score
+            self.depth_nodes.append(self.nodes - start)
+            self._remember_pv(b)
+            if abs(score) > MATE_BOUND: break
+        self.elapsed = time.perf_counter() - t0
+        return best
+
+    def stats(self):
+        # Figures of the last search() for profiling overlays and traces
+        nodes = self.total_nodes
+        return {"depth": self.depth, "nodes": nodes, "qnodes": self.qnodes, "tb_hits": self.tb_hits,
+                "ms": round(1000 * self.elapsed, 1), "nps": int(nodes / self.elapsed) if self.elapsed else 0}
+
+    @property
+    def total_nodes(self):
+        return self.nodes
+
+    def branching_factors(self):
+        # Effective branching factor per iteration: nodes(d) / nodes(d-1)
+        n = self.depth_nodes
+        return [n[i] / n[i - 1] for i in range(1, len(n)) if n[i - 1]]
+
+    @staticmethod
+    def _game_keys(b:chess.Board):
+        # Zobrist keys of positions already on the board, for repetition detection
+        tmp = b.copy(); keys = {}
+        while True:
+            k = chess.polyglot.zobrist_hash(tmp); keys[k] = keys.get(k, 0) + 1
+            if not tmp.move_stack: break
+            tmp.pop()
+        return keys
+
+    def _remember_pv(self, b:chess.Board):
+        tmp = b.copy(stack=False)
+        for mv in self.pv:
+            key = chess.polyglot.zobrist_hash(tmp)
+            self.pv_moves.pop(key, None); self.pv_moves[key] = mv
+            tmp.push(mv)
+        while len(self.pv_moves) > PV_MOVES_MAX: del self.pv_moves[next(iter(self.pv_moves))]
+
+    def _check_limits(self):
+        if self.stop is not None and self.stop.is_set(): raise SearchAborted()
+        if self.deadline is not None and time.time() >= self.deadline: raise SearchAborted()
+        if self.max_nodes is not None and self.nodes >= self.max_nodes: raise SearchAborted()
+
+    def static_eval(self, b:chess.Board):
+        s = self.ev.evaluate(b)
+        return s if b.turn else -s
+
+    @staticmethod
+    def mvv_lva(b:chess.Board, mv:chess.Move):
+        # Most valuable victim first, least valuable attacker as tie-break
+        victim = chess.PAWN if b.is_en_passant(mv) else b.piece_type_at(mv.to_square)
+        return 10 * PIECE_VAL[victim] - PIECE_VAL[b.piece_type_at(mv.from_square)] // 10
+
+    def order(self, b:chess.Board, moves, key:int, hash_move, ply:int):
+        # hash/PV move, then captures (MVV-LVA) and promotions, then killers, then history
+        if not self.ordering:
+            first = [m for m in (self.pv_moves.get(key), hash_move) if m is not None and m in moves]
+            return list(dict.fromkeys(first)) + [m for m in moves if m not in first] if first else moves
+        pv_move = self.pv_moves.get(key)
+        k1, k2 = self.killers[ply] if ply < len(self.killers) else (None, None)
+        side = 4096 if b.turn else 0
+        hist = self.hist
+        def score(m):
+            if m == hash_move or m == pv_move: return ORDER_HASH
+            if b.is_capture(m): return ORDER_CAPTURE + self.mvv_lva(b, m) + (PIECE_VAL[m.promotion] if m.promotion else 0)
+            if m.promotion: return ORDER_CAPTURE + PIECE_VAL[m.promotion]
+            if m == k1: return ORDER_KILLER + 1
+            if m == k2: return ORDER_KILLER
+            return hist[side + m.from_square * 64 + m.to_square]
+        return sorted(moves, key=score, reverse=True)
+
+    def _record_cutoff(self, b:chess.Board, mv:chess.Move, depth:int, ply:int):
+        if b.is_capture(mv) or mv.promotion: return
+        if ply < len(self.killers):
+            k = self.killers[ply]
+            if k[0] != mv: k[1] = k[0]; k[0] = mv
+        i = (4096 if b.turn else 0) + mv.from_square * 64 + mv.to_square
+        self.hist[i] = min(self.hist[i] + depth * depth, ORDER_KILLER - 1)
+
+    def negamax(self, b:chess.Board, depth:int, alpha:int, beta:int, ply:int, abortable:bool=True):
+        self.nodes += 1
+        if abortable and (self.nodes & 1023) == 0: self._check_limits()
+        self.lines[ply] = []
+        key = chess.polyglot.zobrist_hash(b)
+        if ply and (self.seen.get(key) or b.halfmove_clock >= 100): return 0
+        if ply and self.tb is not None:
+            wdl = self.tb.probe_wdl(b, key)
+            if wdl is not None:
+                self.tb_hits += 1
+                return wdl_score(wdl, ply)
+        if depth <= 0:
+            if self.quiescence: return self.qsearch(b, alpha, beta, ply, abortable)
+            return self.static_eval(b)
+        moves = list(b.legal_moves)
+        if not moves: return -MATE + ply if b.is_check() else 0
+
+        alpha0 = alpha
+        hash_move = None
+        e = self.tt.probe(key)
+        if e is not None:
+            hash_move = e[4]
+            if ply and e[1] >= depth:
+                sc = _score_from_tt(e[2], ply)
+                if e[3] == TT_EXACT: return sc
+                if e[3] == TT_LOWER and sc >= beta: return sc
+                if e[3] == TT_UPPER and sc <= alpha: return sc
+
+        best, best_move = -MATE - 1, None
+        self.seen[key] = self.seen.get(key, 0) + 1
+        try:
+            for mv in self.order(b, moves, key, hash_move, ply):
+                self.ev.push(b, mv)
+                try: sc = -self.negamax(b, depth - 1, -beta, -alpha, ply + 1, abortable)
+                finally: self.ev.pop(b)
+                if sc > best:
+                    best, best_move = sc, mv
+                    if sc > alpha:
+                        alpha = sc
+                        self.lines[ply] = [mv] + self.lines[ply + 1]
+                        if alpha >= beta:
+                            self._record_cutoff(b, mv, depth, ply)
+                            break
+        finally:
+            self.seen[key] -= 1
+        flag = TT_LOWER if best >= beta else TT_EXACT if best > alpha0 else TT_UPPER
+        self.tt.store(key, depth, _score_to_tt(best, ply), flag, best_move)
+        return best
+
+    def qsearch(self, b:chess.Board, alpha:int, beta:int, ply:int, abortable:bool=True):
+        # Capture-only search past the horizon. In check every evasion is searched (no stand-pat).
+        self.nodes += 1; self.qnodes += 1
+        if abortable and (self.nodes & 1023) == 0: self._check_limits()
+        in_check = b.is_check()
+        if in_check:
+            moves = list(b.legal_moves)
+            if not moves: return -MATE + ply
+            stand = -MATE - 1
+        else:
+            stand = self.static_eval(b)
+            if stand >= beta: return stand
+            if stand > alpha: alpha = stand
+            moves = list(b.generate_legal_captures())
+            if not moves: return stand
+        best = stand
+        for mv in sorted(moves, key=lambda m: self.mvv_lva(b, m) if b.is_capture(m) else -10**6, reverse=True):
+            if not in_check and not mv.promotion:
+                victim = chess.PAWN if b.is_en_passant(mv) else b.piece_type_at(mv.to_square)
+                if stand + PIECE_VAL[victim] + DELTA_MARGIN <= alpha: continue  # delta pruning
+            self.ev.push(b, mv)
+            try: sc = -self.qsearch(b, -beta, -alpha, ply + 1, abortable)
+            finally: self.ev.pop(b)
+            if sc > best:
+                best = sc
+                if sc > alpha:
+                    alpha = sc
+                    if alpha >= beta: break
+        return best
+
+def search_report(fens, depth:int=4, **searcher_opts):
+    # Nodes per iteration and effective branching factor summed over a fixed position set.
+    # Compare e.g. search_report(fens) with search_report(fens, ordering=False).
+    totals = [0] * depth
+    for fen in fens:
+        s = Searcher(**searcher_opts)
+        s.search(chess.Board(fen), movetime_ms=None, max_depth=depth)
+        for i, n in enumerate(s.depth_nodes): totals[i] += n
+    for d, n in enumerate(totals, 1):
+        ebf = f"{n / totals[d - 2]:.2f}" if d > 1 and totals[d - 2] else "-"
+        print(f"depth {d}: nodes {n:>9}  ebf {ebf}")
+    return totals
+
@@ -0,0 +1,177 @@
+"""Headless self-checks for the parts that are awkward to exercise by hand.
+
+    python -m chessmastery.selfcheck                 # everything
+    python -m chessmastery.selfcheck interaction     # injected input events through Interaction + FrameScheduler
+    python -m chessmastery.selfcheck engine          # UciEngine against the scripted fake engine (fake_uci.py)
+    python -m chessmastery.selfcheck eval            # incremental evaluator against full() over random playouts
+
+Each case prints one line; the command exits 1 if any case fails. No display is needed.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import chess
+
+class Checker:
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.failures = []
+
+    def expect(self, ok, label:str, got=None):
+        print(f"{'ok  ' if ok else 'FAIL'} {label}" + ("" if ok or got is None else f": got {got!r}"), file=self.out)
+        if not ok: self.failures.append(label)
+
+    def equal(self, got, want, label:str):
+        self.expect(got == want, label, got)
+
+class _Handle:
+    # Stand-in for an AIHandle: done() flips when the test says so
+    def __init__(self): self.finished = False
+    def done(self): return self.finished
+
+def check_interaction(c:Checker):
+    from .game import Game
+    from .interaction import IDLE, PROMOTION, SELECTED, Interaction
+    from .scheduler import FrameScheduler
+    sq = chess.parse_square
+
+    g = Game(); ia = Interaction(g)
+    c.equal(ia.click(sq("e4")), ("ignored",), "idle: click on an empty square is ignored")
+    c.equal(ia.click(sq("e7")), ("ignored",), "idle: click on an opponent piece is ignored")
+    c.equal(ia.click(sq("e2")), ("select", sq("e2"), {sq("e3"), sq("e4")}), "idle -> selected with legal targets")
+    c.equal(ia.click(sq("g1"))[:2], ("select", sq("g1")), "selected: own piece reselects")
+    c.equal(ia.click(sq("g4")), ("clear",), "selected: non-target square clears")
+    c.equal(ia.state, IDLE, "cleared selection is idle")
+    ia.click(sq("e2"))
+    c.equal(ia.click(sq("e4")), ("move", chess.Move.from_uci("e2e4")), "selected -> move on a target")
+    c.equal((ia.state, ia.selected), (IDLE, None), "move returns to idle")
+    c.equal(ia.key("q"), None, "keys are not consumed outside the picker")
+    c.equal(ia.choose(chess.QUEEN), ("ignored",), "choose without a pending promotion is ignored")
+
+    g = Game(fen="7k/P7/8/8/8/8/8/K7 w - - 0 1"); ia = Interaction(g)
+    ia.click(sq("a7"))
+    c.equal(ia.click(sq("a8")), ("promote", sq("a7"), sq("a8")), "selected -> promotion on a promoting move")
+    c.equal(ia.state, PROMOTION, "promotion is pending")
+    c.equal(ia.click(sq("a1")), ("ignored",), "board clicks are ignored while the picker is open")
+    c.equal(ia.key("x"), None, "unrelated keys pass through the picker")
+    c.equal(ia.state, PROMOTION, "still pending after ignored input")
+    c.equal(ia.key("n"), ("move", chess.Move.from_uci("a7a8n")), "key n chooses a knight")
+    c.equal(ia.state, IDLE, "choice returns to idle")
+    ia.click(sq("a7")); ia.click(sq("a8"))
+    c.equal(ia.key("escape"), ("clear",), "escape cancels the promotion")
+    c.equal((ia.state, ia.pending), (IDLE, None), "cancel returns to idle")
+    ia.click(sq("a7")); ia.click(sq("a8"))
+    c.equal(ia.choose(chess.ROOK), ("move", chess.Move.from_uci("a7a8r")), "picker button chooses a rook")
+    ia.click(sq("a1"))
+    c.equal(ia.state, SELECTED, "board clicks work again after the choice")
+
+    # FrameScheduler on a fake clock: nothing blocks, work lands on later frames
+    now = [0.0]
+    s = FrameScheduler(clock=lambda: now[0])
+    log = []
+    s.call_later(0.5, log.append, "late"); s.call_later(0.2, log.append, "early"); s.call_later(0.2, log.append, "early2")
+    c.equal(s.run(0.1), 0, "timers do not run before they are due")
+    c.equal((s.run(0.2), log), (2, ["early", "early2"]), "due timers run in scheduling order")
+    c.equal((s.run(0.6), log[-1]), (1, "late"), "later timer runs once due")
+    s.call_soon(lambda: s.call_soon(log.append, "next frame"))
+    c.equal((s.run(1.0), log[-1]), (1, "late"), "a callback scheduled from a callback waits a frame")
+    c.equal((s.run(1.0), log[-1]), (1, "next frame"), "... and runs on the next one")
+    h = _Handle(); s.when_done(h, lambda handle: log.append(handle))
+    c.equal((s.run(1.0), s.pending()), (0, 1), "when_done waits while the job runs")
+    h.finished = True
+    c.equal((s.run(1.0), log[-1] is h, s.pending()), (1, True, 0), "when_done fires once with the handle")
+
+    # The client's promotion flow: a picker button schedules choose(); the move lands on the next frame
+    g = Game(fen="7k/P7/8/8/8/8/8/K7 w - - 0 1"); ia = Interaction(g)
+    actions = []
+    ia.click(sq("a7")); actions.append(ia.click(sq("a8")))
+    s.call_soon(lambda: actions.append(ia.choose(chess.QUEEN)))
+    frames = sum(s.run(2.0 + i) for i in range(100)) if ia.state == PROMOTION else -1
+    c.equal((actions[-1], frames), (("move", chess.Move.from_uci("a7a8q")), 1),
+            "promotion resumes from the scheduler, no nested frame loop")
+
+def check_engine(c:Checker):
+    # Startup, incremental positions vs ucinewgame, crash and hang recovery, stop drain, shutdown
+    from . import fake_uci
+    from .engine import UciEngine
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "uci.log")
+        def sent():
+            with open(log, encoding="utf-8") as f: return f.read().splitlines()
+        def fake(*opts): return [sys.executable, fake_uci.__file__, "--log", log, *opts]
+
+        e = UciEngine(fake(), threads=2, hash_mb=16)
+        b = chess.Board()
+        mv = e.best_move(b, 50)
+        c.expect(mv in b.legal_moves, "startup: a legal best move", mv)
+        c.equal(sent()[:6], ["uci", "setoption name Threads value 2", "setoption name Hash value 16",
+                             "ucinewgame", "isready", "position startpos"], "startup: uci, options, new game once")
+        c.expect(e.last_info.get("nodes") == 20, "info line parsed", e.last_info)
+        pid = e.proc.pid
+        b.push(mv); b.push(next(iter(b.legal_moves)))
+        e.best_move(b, 50)
+        c.equal((sent().count("ucinewgame"), sent()[-2], e.proc.pid),
+                (1, "position startpos moves " + " ".join(m.uci() for m in b.move_stack), pid),
+                "continuation: same process, moves appended, no ucinewgame")
+        b.pop(); b.pop(); b.push(next(iter(b.legal_moves)))
+        e.best_move(b, 50)
+        c.equal((sent().count("ucinewgame"), sent()[-2]), (1, "position startpos moves " + b.move_stack[0].uci()),
+                "undo / ponder miss: same root keeps the hash, no ucinewgame")
+        e.best_move(chess.Board("7k/8/8/8/8/8/8/K6R w - - 0 1"), 50)
+        c.equal((sent().count("ucinewgame"), sent()[-2]), (2, "position fen 7k/8/8/8/8/8/8/K6R w - - 0 1"),
+                "new position: ucinewgame, then position fen")
+
+        stop = threading.Event(); threading.Timer(0.2, stop.set).start()
+        t = time.perf_counter(); mv = e.best_move(chess.Board(), 5000, stop)
+        c.expect(mv is not None and time.perf_counter() - t < 1.5 and sent().count("stop") == 1,
+                 "stop: a 5 s search ends on the stop event and its bestmove is drained", time.perf_counter() - t)
+        c.expect(e.best_move(chess.Board(), 50) is not None and e.proc.pid == pid, "stop: engine still in sync")
+        t = time.perf_counter(); e.ponder(chess.Board(), threading.Event(), max_ms=200)
+        c.expect(time.perf_counter() - t < 1.5 and e.alive(), "ponder: stops itself at max_ms", time.perf_counter() - t)
+        proc = e.proc; e.close()
+        c.expect(proc.poll() is not None and e.proc is None, "close: quit ends the process")
+
+        e = UciEngine(fake("--crash-once", os.path.join(tmp, "crashed")))
+        mv = e.best_move(chess.Board(), 50)
+        c.expect(mv is not None and e.restarts == 1, "crash: restarted once and still answered", (mv, e.restarts))
+        e.close()
+        e = UciEngine(fake("--hang-once", os.path.join(tmp, "hung")))
+        t = time.perf_counter(); mv = e.best_move(chess.Board(), 50)
+        c.expect(mv is not None and e.restarts == 1, "hang: timed out, killed, restarted and answered",
+                 (mv, e.restarts, round(time.perf_counter() - t, 1)))
+        e.close()
+
+def check_eval(c:Checker):
+    # Incremental push/pop scores against a full evaluation, from the perft positions (castling,
+    # en passant and promotions all come up) with and without the mobility term
+    from .bench import PERFT_SUITE
+    from .evaluation import Evaluator, verify_incremental_eval
+    fens = [fen for _, fen, _, _ in PERFT_SUITE]
+    for mobility in (True, False):
+        label = f"incremental eval matches full() ({'with' if mobility else 'no'} mobility)"
+        try:
+            n = verify_incremental_eval(games=100, fens=fens, ev=Evaluator(mobility=mobility))
+            c.expect(n > 5000, label, n)
+        except AssertionError as e:
+            c.expect(False, label, str(e))
+
+CHECKS = {"interaction": check_interaction, "engine": check_engine, "eval": check_eval}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("checks", nargs="*", help=f"any of {', '.join(CHECKS)} (default: all)")
+    args = ap.parse_args(argv)
+    for name in args.checks:
+        if name not in CHECKS: ap.error(f"unknown check {name!r}")
+    c = Checker()
+    for name in args.checks or CHECKS:
+        CHECKS[name](c)
+    print(f"{len(c.failures)} failure(s)" if c.failures else "all checks passed")
+    if c.failures: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
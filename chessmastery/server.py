@@ -0,0 +1,296 @@
+"""Local multi-game server: many independent sessions (board, clocks, coach, AI level) over TCP.
+
+    python -m chessmastery.server serve --port 8765 --jobs 8 [--engines 2]
+    python -m chessmastery.server load --sessions 50 --moves 20 --level 3 --movetime 50
+
+Protocol: one JSON object per line in each direction; every reply echoes the request "id".
+    {"op": "new", "level": 3, "movetime": 200, "clock": 300, "ai": "black", "fen": null}
+    {"op": "move", "session": "s1", "uci": "e2e4"}      -> position after the AI's reply, if any
+    {"op": "state", "session": "s1"}   {"op": "close", "session": "s1"}   {"op": "stats"}
+Replies carry fen, status, legal, coach tips, eval, clocks, the AI move and its latency.
+A session belongs to the connection that created it and is freed when that connection closes.
+
+AI moves run on a shared process pool; each worker keeps one searcher whose transposition table
+(keyed by Zobrist hash, so safe to share) serves every session that lands on it. With --engines N and
+Stockfish on PATH, level 3 sessions share a pool of N persistent engine processes instead. Their hash
+is keyed by position, so it is shared across sessions too; an engine only sends `ucinewgame` when it
+moves to a session with a different start FEN.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+
+from .coach import coach_tips
+from .game import START_CLOCK, Game
+from .search import SEARCH_TIME_MS
+
+MAX_MOVETIME_MS = 2000     # per-move budget ceiling a client may ask for
+CLOCK_FRACTION = 30        # an AI move never spends more than remaining clock / this
+
+# ---------- worker processes ----------
+_player = None  # AIPlayer of this worker process
+
+def _ai_move(root_fen:str, ucis, level:int, movetime_ms:int):
+    # Runs in a pool worker: returns (uci or None, milliseconds, search stats)
+    global _player
+    t = time.perf_counter()
+    if _player is None:
+        from .ai import AIPlayer
+        _player = AIPlayer(engine_path="", threads=1)
+    player = _player
+    player.level, player.movetime_ms = level, movetime_ms
+    b = chess.Board(root_fen)
+    for u in ucis: b.push_uci(u)
+    mv = player.pick_move(b)
+    return (mv.uci() if mv else None), 1000 * (time.perf_counter() - t), player.stats
+
+# ---------- server ----------
+class Session:
+    def __init__(self, sid:str, level:int, movetime_ms:int, clock:float, ai_color, fen:str=None):
+        self.sid, self.level, self.movetime_ms, self.ai_color = sid, level, movetime_ms, ai_color
+        self.game = Game(clock=clock, fen=fen)
+        self.lock = asyncio.Lock()   # one request at a time per session
+        self.root_fen = self.game.board.fen()
+
+    def ai_to_move(self):
+        g = self.game
+        return self.ai_color is not None and g.board.turn == self.ai_color and g.running and not g.snapshot.game_over
+
+    def budget_ms(self):
+        # Per-session move budget, never more than a slice of the AI's remaining clock
+        g = self.game
+        left = g.clock_white if self.ai_color else g.clock_black
+        return max(10, min(self.movetime_ms, int(1000 * left / CLOCK_FRACTION)))
+
+    def view(self):
+        g = self.game; snap = g.snapshot
+        return {"session": self.sid, "fen": g.board.fen(), "status": snap.status(), "over": snap.game_over,
+                "result": g.board.result(claim_draw=True) if snap.game_over else "*",
+                "legal": [m.uci() for m in snap.legal], "coach": coach_tips(g.board, snapshot=snap),
+                "eval": snap.eval, "clocks": [round(g.clock_white, 3), round(g.clock_black, 3)], "level": self.level}
+
+class GameServer:
+    def __init__(self, jobs:int=None, engines:int=0, engine_path:str=None, max_sessions:int=10000):
+        self.pool = ProcessPoolExecutor(jobs or os.cpu_count() or 1)
+        self.sessions = {}
+        self.max_sessions = max_sessions
+        self.ids = itertools.count(1)
+        self.engines = None
+        if engines:
+            from .engine import STOCKFISH_HASH_MB, UciEngine, find_stockfish
+            path = engine_path or find_stockfish()
+            if path:
+                self.engines = asyncio.Queue()
+                for _ in range(engines): self.engines.put_nowait(UciEngine(path, hash_mb=STOCKFISH_HASH_MB))
+        self.moves = 0
+        self.ai_ms = []          # recent AI latencies (bounded below)
+        self.started = time.time()
+        self.server = None
+        self.conns = set()       # connection handler tasks
+
+    async def start(self, host:str="127.0.0.1", port:int=8765):
+        self.server = await asyncio.start_server(self.handle, host, port, limit=1 << 20)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for task in self.conns: task.cancel()
+            await asyncio.gather(*self.conns, return_exceptions=True)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.engines is not None:
+            while not self.engines.empty(): self.engines.get_nowait().close()
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task(); self.conns.add(task)
+        owned = set()  # ids of the sessions this connection created
+        try:
+            while line := await reader.readline():
+                req = {}
+                try:
+                    req = json.loads(line)
+                    reply = {"ok": True, **await self.dispatch(req, owned)}
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    reply = {"ok": False, "error": str(e.args[0] if e.args else type(e).__name__)}
+                if isinstance(req, dict) and "id" in req: reply["id"] = req["id"]
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.conns.discard(task)
+            for sid in owned: self.sessions.pop(sid, None)  # dropped or abandoned connection
+            writer.close()
+
+    def session(self, req):
+        s = self.sessions.get(req["session"])
+        if s is None: raise KeyError(f"unknown session {req['session']!r}")
+        return s
+
+    async def dispatch(self, req:dict, owned:set):
+        op = req.get("op")
+        if op == "new": return await self.op_new(req, owned)
+        if op == "move": return await self.op_move(req)
+        if op == "state":
+            s = self.session(req); s.game.tick(); return s.view()
+        if op == "close":
+            self.sessions.pop(req["session"], None); owned.discard(req["session"]); return {}
+        if op == "stats": return self.stats()
+        raise ValueError(f"unknown op {op!r}")
+
+    async def op_new(self, req, owned:set):
+        if len(self.sessions) >= self.max_sessions: raise ValueError("too many sessions")
+        ai = {"white": chess.WHITE, "black": chess.BLACK, None: None}[req.get("ai", "black")]
+        movetime = max(10, min(int(req.get("movetime", SEARCH_TIME_MS)), MAX_MOVETIME_MS))
+        sid = f"s{next(self.ids)}"
+        s = Session(sid, int(req.get("level", 2)), movetime, float(req.get("clock", START_CLOCK)), ai, req.get("fen"))
+        self.sessions[sid] = s; owned.add(sid)
+        async with s.lock:
+            reply = await self.ai_reply(s)
+        return {**s.view(), **reply}
+
+    async def op_move(self, req):
+        s = self.session(req)
+        async with s.lock:
+            g = s.game
+            g.tick()
+            mv = chess.Move.from_uci(req["uci"])
+            if s.ai_to_move() or not g.running or not g.snapshot.is_legal(mv): raise ValueError(f"illegal move {req['uci']}")
+            g.push(mv); self.moves += 1
+            reply = await self.ai_reply(s)
+        return {**s.view(), **reply}
+
+    async def ai_reply(self, s:Session):
+        # Plays the AI's move if it is on turn; its think time is charged to its clock
+        if not s.ai_to_move(): return {"ai_move": None}
+        g = s.game
+        g.tick()
+        budget = s.budget_ms()
+        t = time.perf_counter()
+        if self.engines is not None and s.level >= 3:
+            uci, stats = await self.engine_move(g.board, budget), None
+        else:
+            ucis = [m.uci() for m in g.board.move_stack]
+            uci, _, stats = await asyncio.get_running_loop().run_in_executor(
+                self.pool, _ai_move, s.root_fen, ucis, s.level, budget)
+        ms = 1000 * (time.perf_counter() - t)
+        g.tick()
+        mv = chess.Move.from_uci(uci) if uci else None
+        if mv is not None and g.running and g.snapshot.is_legal(mv):
+            g.push(mv); self.moves += 1
+        else:
+            mv = None
+        self.ai_ms.append(ms)
+        if len(self.ai_ms) > 100_000: del self.ai_ms[:50_000]
+        return {"ai_move": mv.uci() if mv else None, "ai_ms": round(ms, 2), "ai_stats": stats}
+
+    async def engine_move(self, b:chess.Board, movetime_ms:int):
+        # Borrow one of the pooled engines; UciEngine only starts a fresh game (clearing its hash)
+        # when this session's start FEN differs from the one it searched last
+        engine = await self.engines.get()
+        try:
+            mv = await asyncio.get_running_loop().run_in_executor(None, engine.best_move, b.copy(), movetime_ms)
+        finally:
+            self.engines.put_nowait(engine)
+        return mv.uci() if mv else None
+
+    def stats(self):
+        lat = sorted(self.ai_ms)
+        pct = lambda p: lat[min(len(lat) - 1, -(-p * len(lat) // 100) - 1)] if lat else 0.0
+        up = time.time() - self.started
+        return {"sessions": len(self.sessions), "moves": self.moves, "uptime_s": round(up, 1),
+                "moves_per_s": round(self.moves / up, 2) if up else 0.0,
+                "ai_ms_p50": round(pct(50), 2), "ai_ms_p99": round(pct(99), 2)}
+
+async def serve(host:str, port:int, jobs:int, engines:int):
+    server = GameServer(jobs, engines)
+    port = await server.start(host, port)
+    print(f"chessmastery server on {host}:{port} ({server.pool._max_workers} AI workers"
+          f"{f', {engines} engines' if server.engines is not None else ''})", flush=True)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+# ---------- load generator ----------
+async def _client(host, port, sessions:int, moves:int, level:int, movetime:int, seed:int, lat:list):
+    # One connection playing `sessions` games one after another with random human moves
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    rng = random.Random(seed)
+    served = 0
+    async def call(**req):
+        writer.write(json.dumps(req).encode() + b"\n"); await writer.drain()
+        reply = json.loads(await reader.readline())
+        if not reply.get("ok"): raise RuntimeError(reply.get("error"))
+        return reply
+    for _ in range(sessions):
+        st = await call(op="new", level=level, movetime=movetime, ai="black")
+        for _ in range(moves):
+            if st["over"] or not st["legal"]: break
+            t = time.perf_counter()
+            st = await call(op="move", session=st["session"], uci=rng.choice(st["legal"]))
+            lat.append(1000 * (time.perf_counter() - t))
+            served += 1 + (st["ai_move"] is not None)
+        await call(op="close", session=st["session"])
+    writer.close(); await writer.wait_closed()
+    return served
+
+async def load(host:str, port:int, sessions:int, moves:int, level:int, movetime:int, jobs:int, out=sys.stdout):
+    # Concurrent sessions against a running server, or an in-process one when port is 0
+    server = None
+    if not port:
+        server = GameServer(jobs)
+        port = await server.start(host, 0)
+    lat = []
+    t = time.perf_counter()
+    try:
+        served = sum(await asyncio.gather(*(_client(host, port, 1, moves, level, movetime, i, lat)
+                                            for i in range(sessions))))
+    finally:
+        if server is not None: await server.close()
+    wall = time.perf_counter() - t
+    lat.sort()
+    pct = lambda p: lat[min(len(lat) - 1, -(-p * len(lat) // 100) - 1)] if lat else 0.0
+    res = {"sessions": sessions, "moves": served, "seconds": round(wall, 2), "moves_per_s": round(served / wall, 1),
+           "p50_ms": round(pct(50), 1), "p99_ms": round(pct(99), 1),
+           "mean_ms": round(statistics.fmean(lat), 1) if lat else 0.0}
+    print(f"{sessions} sessions, {served} moves in {wall:.2f} s: {res['moves_per_s']} moves/s, "
+          f"move+AI reply latency p50 {res['p50_ms']} ms, p99 {res['p99_ms']} ms", file=out)
+    return res
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("serve", help="host game sessions")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="AI worker processes")
+    p.add_argument("--engines", type=int, default=0, help="pooled Stockfish processes for level 3 (0 = built-in search)")
+    p = sub.add_parser("load", help="load-test a server (default: an in-process one)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=0, help="0 starts a server in this process")
+    p.add_argument("--sessions", type=int, default=50)
+    p.add_argument("--moves", type=int, default=20, help="human moves per session")
+    p.add_argument("--level", type=int, default=3)
+    p.add_argument("--movetime", type=int, default=50, help="AI budget per move (ms)")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="AI workers of the in-process server")
+    args = ap.parse_args(argv)
+    try:
+        if args.cmd == "serve":
+            asyncio.run(serve(args.host, args.port, args.jobs, args.engines))
+        else:
+            asyncio.run(load(args.host, args.port, args.sessions, args.moves, args.level, args.movetime, args.jobs))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Per-position analysis snapshot: one legal-move generation shared by status, coach, eval and highlighting."""
+from functools import cached_property
+
+import chess
+
+from .evaluation import CENTER_SQS, Evaluator, evaluator
+
+class PositionSnapshot:
+    # Built once per position (Game.snapshot) and dropped on push/undo. Every consumer reads the
+    # same move list instead of regenerating it; `hits` counts the queries that reused it.
+    def __init__(self, b:chess.Board, tablebase=None, ev:Evaluator=None):
+        self.board = b.copy(stack=False)  # for the lazy eval / tablebase probe only
+        self.tablebase, self.ev = tablebase, ev
+        self.turn = b.turn
+        self.legal = list(b.legal_moves)
+        self.legal_set = set(self.legal)
+        self.targets = {}  # from-square -> {to-squares}
+        for mv in self.legal: self.targets.setdefault(mv.from_square, set()).add(mv.to_square)
+        self.captures = {mv for mv in self.legal if b.is_capture(mv)}
+        self.in_check = b.is_check()
+        self.checkmate = self.in_check and not self.legal
+        self.stalemate = not self.in_check and not self.legal
+        self.game_over = (not self.legal or b.is_insufficient_material() or b.is_seventyfive_moves()
+                          or b.is_fivefold_repetition())
+        # attackers of each center square, per color
+        self.center_attacks = {c: [len(b.attackers(c, sq)) for sq in CENTER_SQS] for c in chess.COLORS}
+        self.pieces = chess.popcount(b.occupied)
+        self.hits = 0
+
+    def targets_from(self, fr:int):
+        self.hits += 1
+        return self.targets.get(fr, set())
+
+    def is_legal(self, mv:chess.Move):
+        self.hits += 1
+        return mv in self.legal_set
+
+    def status(self):
+        # i18n key for the status line, or None
+        self.hits += 1
+        if self.checkmate: return "mate"
+        if self.stalemate: return "stalemate"
+        if self.in_check: return "check"
+        return None
+
+    def center_control(self):
+        # Attackers on the center squares, side to move minus opponent
+        return sum(self.center_attacks[self.turn]) - sum(self.center_attacks[not self.turn])
+
+    def san(self, mv:chess.Move, after:"PositionSnapshot"):
+        # SAN of legal move mv from this position, with the +/# suffix read from `after` (the
+        # snapshot once mv is played): same string as Board.san(), without its two movegens
+        b = self.board
+        if b.is_castling(mv):
+            san = "O-O" if chess.square_file(mv.to_square) > chess.square_file(mv.from_square) else "O-O-O"
+        else:
+            piece = b.piece_type_at(mv.from_square)
+            capture = b.is_capture(mv)
+            if piece == chess.PAWN:
+                san = chess.FILE_NAMES[chess.square_file(mv.from_square)] if capture else ""
+            else:
+                san = chess.piece_symbol(piece).upper()
+                others = [m.from_square for m in self.legal if m.to_square == mv.to_square
+                          and m.from_square != mv.from_square and b.piece_type_at(m.from_square) == piece]
+                if others:
+                    same_rank = any(chess.square_rank(sq) == chess.square_rank(mv.from_square) for sq in others)
+                    same_file = any(chess.square_file(sq) == chess.square_file(mv.from_square) for sq in others)
+                    if same_rank or not same_file: san += chess.FILE_NAMES[chess.square_file(mv.from_square)]
+                    if same_file: san += chess.RANK_NAMES[chess.square_rank(mv.from_square)]
+            if capture: san += "x"
+            san += chess.SQUARE_NAMES[mv.to_square]
+            if mv.promotion: san += "=" + chess.piece_symbol(mv.promotion).upper()
+        return san + ("#" if after.checkmate else "+" if after.in_check else "")
+
+    @cached_property
+    def eval(self):
+        # Same value as evaluate(board), without its second mate/stalemate movegen
+        self.hits += 1
+        if self.checkmate: return -99999 if self.turn else 99999
+        if self.stalemate: return 0
+        return (self.ev or evaluator).full(self.board)
+
+    @cached_property
+    def wdl(self):
+        # Side-to-move Syzygy WDL, or None when no tablebase covers the position
+        return self.tablebase.probe_wdl(self.board) if self.tablebase is not None else None
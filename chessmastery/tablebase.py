@@ -0,0 +1,113 @@
+"""Optional local Syzygy tablebase probing (WDL/DTZ) with a probe cache.
+
+Tables are looked up in $SYZYGY_PATH (os.pathsep-separated) or assets/syzygy. With no tables
+every probe returns None and callers fall back to search/evaluation.
+"""
+import os
+import threading
+
+import chess
+
+TB_PATH = os.environ.get("SYZYGY_PATH") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "syzygy")
+TB_MAX_FDS = 64           # python-chess keeps at most this many tables open (LRU), each memory-mapped
+TB_CACHE_SIZE = 1 << 16   # cached WDL results
+TB_WIN = 20000            # search score of a tablebase win: above any eval, below mate scores
+TB_MAX_PIECES = 7         # largest Syzygy tables; bigger positions never touch the directory
+
+def wdl_score(wdl:int, ply:int=0):
+    # Search score for a side-to-move WDL; cursed wins / blessed losses are draws under the 50-move rule
+    if wdl > 1: return TB_WIN - ply
+    if wdl < -1: return -TB_WIN + ply
+    return 0
+
+def wdl_result(wdl:int, white_to_move:bool):
+    # PGN-style result string for a side-to-move WDL
+    if -1 <= wdl <= 1: return "1/2-1/2"
+    return "1-0" if (wdl > 0) == white_to_move else "0-1"
+
+class Tablebase:
+    # One instance may be shared by the UI thread and the AI worker: the cache and the
+    # python-chess tables are only touched under self.lock.
+    def __init__(self, paths:str=TB_PATH, max_fds:int=TB_MAX_FDS, cache_size:int=TB_CACHE_SIZE):
+        self.paths = paths
+        self.max_fds = max_fds
+        self.cache_size = cache_size
+        self.tb = None
+        self.available = None  # unknown until first probe
+        self.max_pieces = 0
+        self.cache = {}
+        self.probes = self.cache_hits = 0
+        self.lock = threading.RLock()
+
+    def open(self):
+        if self.available is None:
+            import chess.syzygy
+            self.tb = chess.syzygy.Tablebase(max_fds=self.max_fds)
+            for path in filter(os.path.isdir, (self.paths or "").split(os.pathsep)):
+                try: self.tb.add_directory(path)
+                except OSError: pass
+            names = list(self.tb.wdl)
+            self.max_pieces = max((len(n) - 1 for n in names), default=0)  # "KQvK" -> 3
+            self.available = bool(names)
+        return self.available
+
+    def covers(self, b:chess.Board):
+        # The directory is only scanned once a position is small enough to be in any table
+        n = chess.popcount(b.occupied)
+        if n > TB_MAX_PIECES or b.castling_rights: return False
+        with self.lock: return self.open() and n <= self.max_pieces
+
+    def probe_wdl(self, b:chess.Board, key=None):
+        # Side-to-move WDL (2 win, 1 cursed win, 0 draw, -1 blessed loss, -2 loss) or None
+        if not self.covers(b): return None
+        key = b._transposition_key() if key is None else key
+        with self.lock:
+            wdl = self.cache.get(key)
+            if wdl is not None:
+                self.cache_hits += 1
+                return wdl
+            self.probes += 1
+            wdl = self.tb.get_wdl(b)
+            if wdl is not None:
+                if len(self.cache) >= self.cache_size: del self.cache[next(iter(self.cache))]
+                self.cache[key] = wdl
+            return wdl
+
+    def probe_dtz(self, b:chess.Board):
+        if not self.covers(b): return None
+        with self.lock: return self.tb.get_dtz(b)
+
+    def best_move(self, b:chess.Board):
+        # Root move by WDL, then DTZ: fastest conversion when winning, longest resistance when losing.
+        # Returns (move, wdl of b for the side to move) or (None, None) when b is not covered.
+        if not self.covers(b): return None, None
+        with self.lock: return self._best_move(b)
+
+    def _best_move(self, b:chess.Board):
+        best = None
+        for mv in b.legal_moves:
+            zeroing = b.is_zeroing(mv)
+            b.push(mv)
+            try:
+                if b.is_checkmate(): return mv, 2
+                wdl, dtz = self.tb.get_wdl(b), self.tb.get_dtz(b)
+            finally:
+                b.pop()
+            if wdl is None or dtz is None: return None, None
+            wdl = -wdl
+            # after our move dtz is from the opponent's view: negative when they are losing
+            rank = (wdl, -abs(dtz) if wdl > 0 else abs(dtz), zeroing and wdl > 0)
+            if best is None or rank > best[0]: best = (rank, mv)
+        return (best[1], best[0][0]) if best else (None, None)
+
+    def close(self):
+        with self.lock:
+            if self.tb is not None: self.tb.close()
+            self.tb = None; self.available = None; self.cache = {}
+
+_default_tablebase = None
+
+def default_tablebase():
+    global _default_tablebase
+    if _default_tablebase is None: _default_tablebase = Tablebase()
+    return _default_tablebase
@@ -0,0 +1,141 @@
+"""AI-vs-AI self-play tournaments across a process pool.
+
+    python -m chessmastery.tournament --a level=3,movetime=50 --b level=3,movetime=50,center=20 --games 2000
+
+Player specs are comma-separated key=value pairs:
+    level, movetime (ms, 0 = none), nodes (per-move node limit; level 3 needs movetime or nodes), name,
+    pawn/knight/bishop/rook/queen (PIECE_VAL), center (CENTER_BONUS), mobility (MOBILITY_BONUS),
+    castle (CASTLE_BONUS), search_mobility (0/1: use the mobility term at search leaves; setting
+    mobility turns it on).
+Each opening (random plies from the start position) is played twice with colors swapped.
+Games stream to a PGN file and a one-line-per-game JSONL results file as they finish.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import chess
+
+from .ai import AIPlayer
+from .evaluation import SEARCH_MOBILITY, Evaluator
+from .pgn import game_to_pgn
+
+PIECE_KEYS = {"pawn": chess.PAWN, "knight": chess.KNIGHT, "bishop": chess.BISHOP, "rook": chess.ROOK, "queen": chess.QUEEN}
+EVAL_KEYS = {"center": "center_bonus", "mobility": "mobility_bonus", "castle": "castle_bonus"}
+
+def parse_spec(text:str, default_name:str):
+    spec = {"name": default_name, "level": 3, "movetime": 50, "nodes": 0}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        key, _, value = part.partition("=")
+        known = key in spec or key in PIECE_KEYS or key in EVAL_KEYS or key == "search_mobility"
+        if not known or not value: raise ValueError(f"bad player option {part!r}")
+        spec[key] = value if key == "name" else int(value)
+    if spec["level"] >= 3 and not spec["movetime"] and not spec["nodes"]:
+        raise ValueError(f"player {spec['name']}: level 3 needs a movetime or nodes limit")
+    if "mobility" in spec and spec.get("search_mobility", 1) == 0:
+        raise ValueError(f"player {spec['name']}: mobility has no effect with search_mobility=0")
+    return spec
+
+def make_player(spec:dict):
+    piece_val = {PIECE_KEYS[k]: v for k, v in spec.items() if k in PIECE_KEYS}
+    weights = {EVAL_KEYS[k]: v for k, v in spec.items() if k in EVAL_KEYS}
+    mobility = spec.get("search_mobility", "mobility" in spec or SEARCH_MOBILITY)  # tuning the term needs it on
+    ev = Evaluator(piece_val=piece_val, mobility=bool(mobility), **weights)
+    return AIPlayer(level=spec["level"], engine_path="", movetime_ms=spec["movetime"] or None,
+                    max_nodes=spec["nodes"] or None, evaluator=ev, book=False, tablebase=False,
+                    threads=1)  # pool workers are daemonic and cannot start helper processes
+
+def random_opening(rng:random.Random, plies:int):
+    b = chess.Board()
+    for _ in range(plies):
+        moves = list(b.legal_moves)
+        if not moves: break
+        b.push(rng.choice(moves))
+    return b if not b.is_game_over() else chess.Board()
+
+def play_game(task):
+    # Runs in a pool worker. task = (index, white spec, black spec, opening seed, opening plies, max plies)
+    index, white, black, seed, opening_plies, max_plies = task
+    random.seed(seed * 2 + index % 2)  # level 1 draws from the global RNG
+    b = random_opening(random.Random(seed), opening_plies)
+    players = {chess.WHITE: make_player(white), chess.BLACK: make_player(black)}
+    t0 = time.time()
+    while not b.is_game_over(claim_draw=True) and len(b.move_stack) < max_plies:
+        mv = players[b.turn].pick_move(b)
+        if mv is None: break
+        b.push(mv)
+    result = b.result(claim_draw=True)
+    if result == "*": result = "1/2-1/2"  # adjudicated at max plies
+    game = game_to_pgn(b.move_stack)
+    game.headers.update(Event="ChessMastery3D tournament", Round=str(index + 1),
+                        White=white["name"], Black=black["name"], Result=result)
+    return {"index": index, "white": white["name"], "black": black["name"], "result": result,
+            "plies": len(b.move_stack), "seconds": round(time.time() - t0, 3), "pgn": str(game)}
+
+def elo_diff(wins:int, draws:int, losses:int):
+    # Elo difference of A over B with a 95% interval from the per-game score variance. The interval
+    # is unbounded (inf) when it reaches a 0% or 100% score or the games show no variance at all
+    # (e.g. 8-0 or all draws); a 0%/100% score itself is -inf/+inf Elo.
+    n = wins + draws + losses
+    if n == 0: return 0.0, math.inf
+    score = (wins + 0.5 * draws) / n
+    def elo(s):
+        if s <= 0: return -math.inf
+        if s >= 1: return math.inf
+        return 400 * math.log10(s / (1 - s))
+    var = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / n
+    margin = 1.96 * math.sqrt(var / n)
+    if var == 0 or score - margin <= 0 or score + margin >= 1: return elo(score), math.inf
+    return elo(score), (elo(score + margin) - elo(score - margin)) / 2
+
+def tasks(a:dict, b:dict, games:int, seed:int, opening_plies:int, max_plies:int):
+    for i in range(games):
+        white, black = (a, b) if i % 2 == 0 else (b, a)
+        yield (i, white, black, seed + i // 2, opening_plies, max_plies)
+
+def run(a:dict, b:dict, games:int, jobs:int, pgn_path:str, results_path:str, seed:int=1,
+        opening_plies:int=4, max_plies:int=300, report_every:int=50, out=sys.stdout):
+    wins = draws = losses = 0
+    t0 = time.time()
+    with open(pgn_path, "w", encoding="utf-8") as pgn, open(results_path, "w", encoding="utf-8") as res, \
+            multiprocessing.Pool(jobs) as pool:
+        for done, r in enumerate(pool.imap_unordered(play_game, tasks(a, b, games, seed, opening_plies, max_plies)), 1):
+            pgn.write(r.pop("pgn") + "\n\n")
+            res.write(json.dumps(r) + "\n")
+            a_white = r["white"] == a["name"]
+            if r["result"] == "1/2-1/2": draws += 1
+            elif (r["result"] == "1-0") == a_white: wins += 1
+            else: losses += 1
+            if done % report_every == 0 or done == games:
+                pgn.flush(); res.flush()
+                elo, err = elo_diff(wins, draws, losses)
+                print(f"[{done}/{games}] {a['name']} vs {b['name']}: +{wins} ={draws} -{losses}  "
+                      f"Elo {elo:+.1f} ± {err:.1f}  ({done / (time.time() - t0):.2f} games/s)", file=out, flush=True)
+    return wins, draws, losses
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--a", default="", help="player A spec, e.g. level=3,movetime=50")
+    ap.add_argument("--b", default="", help="player B spec")
+    ap.add_argument("--games", type=int, default=100)
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: all cores)")
+    ap.add_argument("--opening-plies", type=int, default=4, help="random plies before the AIs take over")
+    ap.add_argument("--max-plies", type=int, default=300, help="adjudicate a draw after this many plies")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--pgn", default="tournament.pgn")
+    ap.add_argument("--results", default="tournament.jsonl")
+    args = ap.parse_args(argv)
+    try:
+        a, b = parse_spec(args.a, "A"), parse_spec(args.b, "B")
+    except ValueError as e:
+        ap.error(str(e))
+    if a["name"] == b["name"]: b["name"] += "'"
+    run(a, b, args.games, args.jobs, args.pgn, args.results, args.seed, args.opening_plies, args.max_plies)
+
+if __name__ == "__main__":
+    main()